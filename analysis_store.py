@@ -0,0 +1,274 @@
+"""
+Persistent analysis store keyed by analysis_id.
+
+- One header row per analysis (company, product, geo, frameworks, timestamps),
+  indexed on company, product and created/updated date
+- Each result section (SWOT, Ansoff, Benchmark, Fit, recs) is its own row, so
+  saving one edited framework writes only that section
+- SQLite in WAL mode with one connection per thread (same setup as llm_cache),
+  so every Streamlit session, replica on the same volume and batch run can share it
+- company/product are indexed by their normalized keys (names.py), so "ACME
+  Robotics Inc." finds "Acme robotics"; `similar()` adds a trigram index on top
+  for near-misses and typos
+
+Usage:
+
+    from analysis_store import get_store
+    store = get_store()
+    store.save(state)                                  # after generation
+    store.save_section(state["analysis_id"], "SWOT", state["results"]["SWOT"])
+    state = store.load(analysis_id)                    # reopen without LLM calls
+    store.recent(limit=20, company="acme")             # header rows only
+    store.similar("Acme Robotic", "Edge IoT")          # [(header row, score)]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from names import TrigramIndex, normalize_company, normalize_product
+
+DEFAULT_STORE_PATH = os.getenv("MYSTRAT_ANALYSIS_DB", ".analyses.sqlite")
+
+# state["results"] keys, then top-level state entries stored as sections
+SECTIONS = ("SWOT", "Ansoff", "Benchmark", "Fit", "recs", "provenance")
+_STATE_SECTIONS = ("recs", "provenance")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    analysis_id  TEXT PRIMARY KEY,
+    company      TEXT NOT NULL,
+    product      TEXT NOT NULL,
+    company_key  TEXT NOT NULL,
+    product_key  TEXT NOT NULL,
+    geo          TEXT,
+    notes        TEXT,
+    frameworks   TEXT NOT NULL,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_company ON analyses (company_key, updated_at);
+CREATE INDEX IF NOT EXISTS analyses_product ON analyses (product_key, updated_at);
+CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS analyses_updated_at ON analyses (updated_at);
+CREATE TABLE IF NOT EXISTS sections (
+    analysis_id  TEXT NOT NULL REFERENCES analyses (analysis_id) ON DELETE CASCADE,
+    name         TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    updated_at   REAL NOT NULL,
+    PRIMARY KEY (analysis_id, name)
+);
+"""
+
+
+class AnalysisStore:
+    """SQLite-backed analyses. All methods are safe to call from any thread."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        self._index: Optional[TrigramIndex] = None  # built on first similar()
+        self._index_lock = threading.Lock()
+
+    # ---- Connection handling ----
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _upsert_header(self, conn: sqlite3.Connection, state: Dict[str, Any], now: float) -> None:
+        conn.execute(
+            "INSERT INTO analyses (analysis_id, company, product, company_key, product_key, geo, notes, frameworks, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(analysis_id) DO UPDATE SET company = excluded.company, product = excluded.product, "
+            "company_key = excluded.company_key, product_key = excluded.product_key, geo = excluded.geo, "
+            "notes = excluded.notes, frameworks = excluded.frameworks, updated_at = excluded.updated_at",
+            (
+                state["analysis_id"],
+                state.get("company") or "",
+                state.get("product") or "",
+                normalize_company(state.get("company")),
+                normalize_product(state.get("product")),
+                state.get("geo") or None,
+                state.get("notes") or None,
+                json.dumps(state.get("frameworks") or []),
+                now,
+                now,
+            ),
+        )
+
+    # ---- Writes ----
+    def save(self, state: Dict[str, Any]) -> None:
+        """Write the header and every section present in `state` (one transaction)."""
+        now = time.time()
+        results = state.get("results") or {}
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._upsert_header(conn, state, now)
+            for name in SECTIONS:
+                value = state.get(name) if name in _STATE_SECTIONS else results.get(name)
+                if value is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO sections (analysis_id, name, body, updated_at) VALUES (?, ?, ?, ?)",
+                        (state["analysis_id"], name, json.dumps(value, ensure_ascii=False), now),
+                    )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._index_lock:
+            if self._index is not None:
+                self._index.add(state["analysis_id"], state.get("company") or "", state.get("product") or "")
+
+    def save_section(self, analysis_id: str, name: str, value: Any) -> bool:
+        """Replace one section of a stored analysis; False if the analysis is not stored yet."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute("UPDATE analyses SET updated_at = ? WHERE analysis_id = ?", (now, analysis_id))
+            if cur.rowcount:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sections (analysis_id, name, body, updated_at) VALUES (?, ?, ?, ?)",
+                    (analysis_id, name, json.dumps(value, ensure_ascii=False), now),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(cur.rowcount)
+
+    def delete(self, analysis_id: str) -> None:
+        self._conn().execute("DELETE FROM analyses WHERE analysis_id = ?", (analysis_id,))
+        with self._index_lock:
+            if self._index is not None:
+                self._index.remove(analysis_id)
+
+    def rekey(self) -> int:
+        """Recompute the normalized keys of every row (after editing the alias table)."""
+        conn = self._conn()
+        rows = conn.execute("SELECT analysis_id, company, product FROM analyses").fetchall()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE analyses SET company_key = ?, product_key = ? WHERE analysis_id = ?",
+                [(normalize_company(c), normalize_product(p), aid) for aid, c, p in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._index_lock:
+            self._index = None
+        return len(rows)
+
+    # ---- Reads ----
+    def load(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """The stored analysis as an app `state` dict, or None."""
+        conn = self._conn()
+        head = conn.execute(
+            "SELECT company, product, geo, notes, frameworks FROM analyses WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()
+        if head is None:
+            return None
+        state: Dict[str, Any] = {
+            "analysis_id": analysis_id,
+            "company": head[0],
+            "product": head[1],
+            "geo": head[2],
+            "notes": head[3],
+            "frameworks": json.loads(head[4]),
+            "results": {},
+            "recs": [],
+        }
+        for name, body in conn.execute("SELECT name, body FROM sections WHERE analysis_id = ?", (analysis_id,)):
+            if name in _STATE_SECTIONS:
+                state[name] = json.loads(body)
+            else:
+                state["results"][name] = json.loads(body)
+        return state
+
+    def recent(
+        self,
+        *,
+        limit: int = 20,
+        company: Optional[str] = None,
+        product: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Header rows, most recently updated first; company/product match case-insensitively."""
+        where, args = [], []
+        if company:
+            where.append("company_key = ?")
+            args.append(normalize_company(company))
+        if product:
+            where.append("product_key = ?")
+            args.append(normalize_product(product))
+        if since is not None:
+            where.append("updated_at >= ?")
+            args.append(since)
+        sql = _HEADER_SQL
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        return [_header(r) for r in self._conn().execute(sql, (*args, limit))]
+
+    def similar(
+        self, company: str, product: Optional[str] = None, *, limit: int = 5, min_score: float = 0.5
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Stored analyses whose company (and product) are close to the given names.
+
+        Score 1.0 means the normalized keys are identical. The trigram index is
+        built from the header rows on first use and kept current by save()/delete().
+        """
+        with self._index_lock:
+            if self._index is None:
+                self._index = TrigramIndex()
+                self._index.add_many(self._conn().execute("SELECT analysis_id, company, product FROM analyses"))
+            hits = self._index.search(company, product, limit=limit, min_score=min_score)
+        if not hits:
+            return []
+        ids = [aid for aid, _ in hits]
+        rows = self._conn().execute(
+            _HEADER_SQL + f" WHERE analysis_id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+        headers = {r[0]: _header(r) for r in rows}
+        return [(headers[aid], score) for aid, score in hits if aid in headers]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+
+_HEADER_SQL = "SELECT analysis_id, company, product, geo, frameworks, created_at, updated_at FROM analyses"
+
+
+def _header(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {
+        "analysis_id": row[0], "company": row[1], "product": row[2], "geo": row[3],
+        "frameworks": json.loads(row[4]), "created_at": row[5], "updated_at": row[6],
+    }
+
+
+_LOCK = threading.Lock()
+_STORES: Dict[str, AnalysisStore] = {}
+
+
+def get_store(path: Optional[str] = None) -> AnalysisStore:
+    """Process-wide store for `path` (default MYSTRAT_ANALYSIS_DB / .analyses.sqlite)."""
+    path = path or DEFAULT_STORE_PATH
+    with _LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = AnalysisStore(path)
+        return store
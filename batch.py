@@ -0,0 +1,346 @@
+"""
+Headless batch runner: StrategyGenerator + build_ppt_from_state over many rows.
+
+- Reads CSV or JSONL rows with: company, product[, geo, notes, frameworks, peers, id]
+- Fans rows out over a thread or process pool
+- Appends one JSON line per finished row to <out>/results.jsonl and writes
+  <out>/decks/<key>.pptx as each row completes
+- results.jsonl doubles as the checkpoint: rerunning with the same --out skips
+  rows already recorded as "ok", so a crashed run resumes without new LLM calls
+- Prints throughput (analyses/min) and failures at the end
+- `--portfolio deck.pptx` also streams every ok row into one portfolio deck
+
+Usage:
+
+    python batch.py portfolio.csv --out runs/q3 --workers 8
+    python batch.py rows.jsonl --out runs/demo --offline --pool process --no-pptx
+
+`frameworks` and `peers` columns accept ";" or "," separated values.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import metrics
+
+DEFAULT_FRAMEWORKS = ["SWOT", "Ansoff"]
+DEFAULT_PEERS = ["Rival A", "Rival B"]
+
+
+@dataclass
+class BatchOptions:
+    out_dir: str
+    model: str = "gpt-4o-mini"
+    offline: bool = False
+    cache_path: Optional[str] = None
+    combined: bool = False
+    pptx: bool = True
+    frameworks: List[str] = field(default_factory=lambda: list(DEFAULT_FRAMEWORKS))
+    # per-process budgets (split them across processes when using --pool process)
+    requests_per_min: float = 500
+    tokens_per_min: float = 200_000
+    # >0: render decks in a separate process pool (thread pool runs only)
+    export_workers: int = 0
+
+
+# ---------------------- Input ----------------------
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in re.split(r"[;,|]", str(value or "")) if v.strip()]
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield input rows from a .csv or .jsonl/.ndjson file."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    """Stable identity for checkpointing: the row's `id` or a hash of its inputs."""
+    if str(row.get("id") or "").strip():
+        return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(row["id"]).strip())
+    ident = json.dumps(
+        [str(row.get(k) or "").strip() for k in ("company", "product", "geo", "notes", "frameworks", "peers")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(results_path: str) -> Set[str]:
+    """Keys of rows already finished successfully in a previous run."""
+    done: Set[str] = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            if rec.get("status") == "ok":
+                done.add(rec["key"])
+    return done
+
+
+# ---------------------- Worker ----------------------
+
+_GEN = None  # per-process StrategyGenerator (process pool) or shared one (thread pool)
+
+
+def _make_generator(opts: BatchOptions):
+    from generate import StrategyGenerator
+
+    provider = None
+    if not opts.offline:
+        from providers import get_provider
+
+        provider = get_provider(
+            opts.model,
+            requests_per_min=opts.requests_per_min,
+            tokens_per_min=opts.tokens_per_min,
+            cache_path=opts.cache_path,
+        )
+    return StrategyGenerator(provider, max_workers=4, combined=opts.combined)
+
+
+def _init_worker(opts: BatchOptions) -> None:
+    global _GEN
+    _GEN = _make_generator(opts)
+
+
+def analyze_row(key: str, row: Dict[str, Any], opts: BatchOptions) -> Dict[str, Any]:
+    """Generate one analysis (and deck). Never raises: failures come back as records.
+    `timings_ms` in the record splits the time by span (llm.*, parse.json, pptx.*).
+    """
+    with metrics.span("analysis.batch_row", key=key) as sp:
+        rec = _analyze_row(key, row, opts)
+    if getattr(sp, "trace_id", None):
+        rec["timings_ms"] = metrics.trace_breakdown(sp.trace_id)
+    return rec
+
+
+def _analyze_row(key: str, row: Dict[str, Any], opts: BatchOptions) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    company = str(row.get("company") or "").strip()
+    product = str(row.get("product") or "").strip()
+    rec: Dict[str, Any] = {"key": key, "company": company, "product": product}
+    try:
+        if not company or not product:
+            raise ValueError("company and product are required")
+        state = {
+            "analysis_id": str(row.get("analysis_id") or uuid.uuid4()),
+            "company": company,
+            "product": product,
+            "geo": str(row.get("geo") or "").strip() or None,
+            "notes": str(row.get("notes") or "").strip() or None,
+            "frameworks": _split(row.get("frameworks")) or list(opts.frameworks),
+        }
+        results, recs = _GEN.generate_analysis(
+            company=company,
+            product=product,
+            frameworks=state["frameworks"],
+            notes=state["notes"],
+            geo=state["geo"],
+            peers=_split(row.get("peers")) or list(DEFAULT_PEERS),
+        )
+        state.update({"results": results, "recs": recs})
+        rec.update(state)
+        if opts.pptx:
+            path = os.path.join(opts.out_dir, "decks", f"{key}.pptx")
+            if opts.export_workers > 0:
+                from export_service import get_export_service
+
+                rec["pptx"] = get_export_service(opts.export_workers).render_to_file(state, path)
+            else:
+                from export_ppt import build_ppt_from_state
+
+                bio, _ = build_ppt_from_state(state)
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(bio.getvalue())
+                os.replace(tmp, path)
+                rec["pptx"] = path
+        rec["status"] = "ok"
+    except Exception as e:
+        rec.update({"status": "failed", "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc(limit=5)})
+    rec["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return rec
+
+
+# ---------------------- Driver ----------------------
+
+def _provider_stats(gen) -> Dict[str, Any]:
+    """Counters from the wrapper chain (rate limiter, cache) of a generator's provider."""
+    out: Dict[str, Any] = {}
+    p = getattr(gen, "provider", None)
+    while p is not None:
+        if hasattr(p, "limiter"):
+            out["rate_limit"] = p.limiter.stats()
+        if hasattr(p, "cache"):
+            out["cache"] = p.cache.stats()
+        p = getattr(p, "inner", None)
+    return out
+
+
+def _write_record(out: Any, rec: Dict[str, Any], failures: List[Dict[str, Any]], n: int, total: int) -> int:
+    """Append one finished record to results.jsonl; 1 if it succeeded."""
+    # single writer: the record is the checkpoint, so flush it before moving on
+    out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    out.flush()
+    os.fsync(out.fileno())
+    print(f"[{n}/{total}] {rec['status']:6} {rec['company']} / {rec['product']} ({rec['elapsed_s']}s)", file=sys.stderr)
+    if rec["status"] == "ok":
+        return 1
+    failures.append({"key": rec["key"], "company": rec["company"], "product": rec["product"], "error": rec["error"]})
+    return 0
+
+
+def run_batch(input_path: str, opts: BatchOptions, *, workers: int = 4, pool: str = "thread") -> Dict[str, Any]:
+    os.makedirs(os.path.join(opts.out_dir, "decks"), exist_ok=True)
+    results_path = os.path.join(opts.out_dir, "results.jsonl")
+    done = load_checkpoint(results_path)
+
+    # first pass keeps only keys; rows are read again as they are submitted
+    todo: Set[str] = set()
+    skipped = 0  # input rows already finished in a previous run
+    for row in read_rows(input_path):
+        key = row_key(row)
+        if key in done:
+            skipped += 1
+        else:
+            todo.add(key)
+    total = len(todo)
+    from generate import json_repair_stats, token_usage_stats
+
+    if pool == "process":
+        opts = replace(opts, export_workers=0)  # each worker process renders its own decks
+        # spawn, not fork: this process may already run threads (see export_service)
+        executor: Executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(opts,),
+        )
+    else:
+        _init_worker(opts)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+
+    ok, failures, n = 0, [], 0
+    window = 2 * max(1, workers)  # rows in flight; bounds memory on big inputs
+    t0 = time.perf_counter()
+    with executor, open(results_path, "a", encoding="utf-8") as out:
+        in_flight: Set[Future] = set()
+        for row in read_rows(input_path):
+            key = row_key(row)
+            if key not in todo:  # finished earlier, or a duplicate already submitted
+                continue
+            todo.discard(key)
+            in_flight.add(executor.submit(analyze_row, key, row, opts))
+            if len(in_flight) < window:
+                continue
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                n += 1
+                ok += _write_record(out, fut.result(), failures, n, total)
+        for fut in as_completed(in_flight):
+            n += 1
+            ok += _write_record(out, fut.result(), failures, n, total)
+    elapsed = time.perf_counter() - t0
+    if opts.export_workers > 0:
+        from export_service import shutdown_export_service
+
+        shutdown_export_service()
+
+    return {
+        "input": input_path,
+        "out_dir": opts.out_dir,
+        "processed": total,
+        "ok": ok,
+        "failed": len(failures),
+        "skipped_from_checkpoint": skipped,
+        "elapsed_s": round(elapsed, 2),
+        "analyses_per_min": round(ok / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "failures": failures,
+        # thread pool only: process workers keep their own counters
+        "provider": _provider_stats(_GEN) if pool == "thread" else {},
+        "json_repairs": json_repair_stats() if pool == "thread" else {},
+        "tokens": token_usage_stats() if pool == "thread" else {},
+        "spans": metrics.summary()["spans"] if pool == "thread" else {},
+        "options": asdict(opts),
+    }
+
+
+def iter_ok_results(results_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream successful analysis records from results.jsonl (first "ok" per key)."""
+    seen: Set[str] = set()
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("status") == "ok" and rec["key"] not in seen:
+                seen.add(rec["key"])
+                yield rec
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Run strategy analyses + PPTX export over a CSV/JSONL file.")
+    ap.add_argument("input", help="CSV or JSONL file with company/product rows")
+    ap.add_argument("--out", required=True, help="output directory (results.jsonl, decks/); reused to resume")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--pool", choices=["thread", "process"], default="thread")
+    ap.add_argument("--model", default="gpt-4o-mini")
+    ap.add_argument("--offline", action="store_true", help="no LLM calls; use the built-in fallbacks")
+    ap.add_argument("--cache", default=None, help="LLM response cache (SQLite path) shared by all workers")
+    ap.add_argument("--combined", action="store_true", help="one LLM request per analysis")
+    ap.add_argument("--frameworks", default=",".join(DEFAULT_FRAMEWORKS), help="default when a row has none")
+    ap.add_argument("--no-pptx", action="store_true")
+    ap.add_argument("--rpm", type=float, default=500, help="requests/min budget per process")
+    ap.add_argument("--tpm", type=float, default=200_000, help="tokens/min budget per process")
+    ap.add_argument("--export-workers", type=int, default=0, help="render decks in N processes (thread pool only)")
+    ap.add_argument("--portfolio", default=None, help="also write one portfolio deck of all ok rows to this path")
+    args = ap.parse_args(argv)
+
+    opts = BatchOptions(
+        out_dir=args.out,
+        model=args.model,
+        offline=args.offline,
+        cache_path=args.cache,
+        combined=args.combined,
+        pptx=not args.no_pptx,
+        frameworks=_split(args.frameworks) or list(DEFAULT_FRAMEWORKS),
+        requests_per_min=args.rpm,
+        tokens_per_min=args.tpm,
+        export_workers=args.export_workers,
+    )
+    summary = run_batch(args.input, opts, workers=args.workers, pool=args.pool)
+    if args.portfolio:
+        from export_ppt import build_portfolio
+
+        summary["portfolio"] = build_portfolio(iter_ok_results(os.path.join(opts.out_dir, "results.jsonl")), args.portfolio)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+End-to-end benchmark: generate_selected_frameworks -> generate_recommendations -> build_ppt_from_state.
+
+- Runs entirely offline against mock_llm.SimulatedProvider (latency, errors, 429s)
+- Sweeps concurrency levels; reports per-analysis latency percentiles, per-stage
+  means, throughput (analyses/min), retries/throttles and peak Python heap
+- Writes a JSON report (with git revision and library versions) that can be
+  compared against a report from another version with --compare
+
+Usage:
+
+    python bench.py --concurrency 1,4,16 --analyses 32 --latency-ms 600 --out bench.json
+    python bench.py --concurrency 1,4,16 --analyses 32 --latency-ms 600 --compare bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from generate import StrategyGenerator
+from mock_llm import SimulatedProvider
+from ratelimit import RateLimitedProvider, RateLimiter, RetryPolicy
+
+FRAMEWORKS = ["SWOT", "Ansoff", "Benchmark"]
+PEERS = ["Rival A", "Rival B"]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        rev = ""
+    versions = {}
+    for mod in ("pptx", "lxml"):
+        try:
+            versions[mod] = __import__(mod).__version__
+        except Exception:
+            versions[mod] = None
+    return {"git_rev": rev, "python": platform.python_version(), "platform": platform.platform(), **versions}
+
+
+def run_one(gen: StrategyGenerator, i: int, *, pptx: bool) -> Dict[str, float]:
+    """One analysis end to end; returns stage timings in seconds."""
+    from export_ppt import build_ppt_from_state
+
+    t0 = time.perf_counter()
+    company = f"Company {i}"
+    results = gen.generate_selected_frameworks(
+        company=company, product=f"Product {i % 7}", frameworks=FRAMEWORKS, notes="benchmark", geo="US", peers=PEERS,
+    )
+    t1 = time.perf_counter()
+    recs = gen.generate_recommendations(results)
+    t2 = time.perf_counter()
+    size = 0
+    if pptx:
+        state = {"company": company, "product": f"Product {i % 7}", "frameworks": FRAMEWORKS, "results": results, "recs": recs}
+        bio, _ = build_ppt_from_state(state)
+        size = len(bio.getvalue())
+    t3 = time.perf_counter()
+    return {"frameworks_s": t1 - t0, "recs_s": t2 - t1, "pptx_s": t3 - t2, "total_s": t3 - t0, "pptx_bytes": size}
+
+
+def run_level(args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    sim = SimulatedProvider(
+        latency=args.latency, latency_ms=args.latency_ms, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+    )
+    limiter = RateLimiter(
+        requests_per_min=args.rpm, tokens_per_min=args.tpm,
+        initial_concurrency=max(4, concurrency * 3), max_concurrency=max(32, concurrency * 4),
+        retry=RetryPolicy(base_delay=args.latency_ms / 4000.0),
+    )
+    gen = StrategyGenerator(RateLimitedProvider(sim, limiter), max_workers=args.framework_workers)
+
+    # warm imports (python-pptx template load) outside the measured window
+    run_one(StrategyGenerator(None), -1, pptx=not args.no_pptx)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    samples: List[Dict[str, float]] = []
+    errors = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(run_one, gen, i, pptx=not args.no_pptx) for i in range(args.analyses)]
+        for fut in futures:
+            try:
+                samples.append(fut.result())
+            except Exception:
+                errors += 1
+    wall = time.perf_counter() - t0
+    peak_mb = None
+    if args.trace_memory:
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+
+    totals = [s["total_s"] for s in samples]
+    return {
+        "concurrency": concurrency,
+        "analyses": args.analyses,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_per_min": round(len(samples) / wall * 60, 2) if wall > 0 else 0.0,
+        "latency_s": {
+            "mean": round(statistics.fmean(totals), 4) if totals else 0.0,
+            "p50": round(_percentile(totals, 50), 4),
+            "p95": round(_percentile(totals, 95), 4),
+            "p99": round(_percentile(totals, 99), 4),
+        },
+        "stage_mean_s": {
+            k: round(statistics.fmean(s[k] for s in samples), 4) if samples else 0.0
+            for k in ("frameworks_s", "recs_s", "pptx_s")
+        },
+        "pptx_bytes_mean": int(statistics.fmean(s["pptx_bytes"] for s in samples)) if samples else 0,
+        "peak_heap_mb": peak_mb,
+        "provider": {**sim.counters, **{k: v for k, v in limiter.stats().items() if k in ("retries", "throttles", "failures")}},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """Text table of throughput / p95 / peak-heap deltas per concurrency level."""
+    base = {lvl["concurrency"]: lvl for lvl in baseline.get("levels", [])}
+    lines = [
+        f"baseline {baseline.get('environment', {}).get('git_rev', '?')} -> current {current['environment'].get('git_rev', '?')}",
+        f"{'conc':>5} {'thr/min':>16} {'p95 s':>16} {'heap MB':>16}",
+    ]
+
+    def _delta(new: Optional[float], old: Optional[float]) -> str:
+        if new is None or old is None:
+            return f"{new if new is not None else '-':>16}"
+        pct = ((new - old) / old * 100) if old else 0.0
+        return f"{new:>8.2f} ({pct:+5.1f}%)"
+
+    for lvl in current["levels"]:
+        old = base.get(lvl["concurrency"])
+        if old is None:
+            lines.append(f"{lvl['concurrency']:>5}  (no baseline)")
+            continue
+        lines.append(
+            f"{lvl['concurrency']:>5} "
+            f"{_delta(lvl['throughput_per_min'], old['throughput_per_min'])} "
+            f"{_delta(lvl['latency_s']['p95'], old['latency_s']['p95'])} "
+            f"{_delta(lvl['peak_heap_mb'], old.get('peak_heap_mb'))}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline end-to-end benchmark of generation + PPTX export.")
+    ap.add_argument("--concurrency", default="1,4,16", help="comma-separated analysis concurrency levels")
+    ap.add_argument("--analyses", type=int, default=16, help="analyses per level")
+    ap.add_argument("--framework-workers", type=int, default=4, help="StrategyGenerator.max_workers")
+    ap.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--jitter", type=float, default=0.4)
+    ap.add_argument("--tokens-per-sec", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0)
+    ap.add_argument("--rpm", type=float, default=100_000)
+    ap.add_argument("--tpm", type=float, default=100_000_000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--no-pptx", action="store_true")
+    ap.add_argument("--no-trace-memory", dest="trace_memory", action="store_false")
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    ap.add_argument("--compare", default=None, help="baseline JSON report to diff against")
+    args = ap.parse_args(argv)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "levels": [],
+    }
+    for c in levels:
+        lvl = run_level(args, c)
+        report["levels"].append(lvl)
+        print(
+            f"conc={c:<3} thr={lvl['throughput_per_min']:>8.1f}/min p50={lvl['latency_s']['p50']:.3f}s "
+            f"p95={lvl['latency_s']['p95']:.3f}s pptx={lvl['stage_mean_s']['pptx_s']:.3f}s heap={lvl['peak_heap_mb']}MB",
+            file=sys.stderr,
+        )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(report, json.load(f)))
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
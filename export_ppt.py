@@ -4,6 +4,10 @@ PowerPoint export skeleton for Strategy Copilot (Step 1)
 - Requires: python-pptx (pip install python-pptx)
 - Builds a polished 16:9 deck from your session_state
 - Slides: Title, Agenda, Executive Snapshot, SWOT, Ansoff 2x2, Benchmark table, Top-5 Recommendations (Impact×Effort grid), Appendix
+- Title + Agenda and the layout lookup are compiled once per process (`DeckTemplate`)
+- `build_ppt_cached()` memoizes rendered bytes by a hash of the exported state
+- The raw analysis is embedded as a JSON part (`load_analysis()` reads it back)
+- `build_portfolio()` streams many analyses into one deck on disk
 
 Usage in Streamlit (Export step):
 
@@ -12,18 +16,26 @@ Usage in Streamlit (Export step):
     st.download_button("Download PPTX", data=bio.getvalue(), file_name=fname, mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
 
 This module is defensive: missing sections are skipped gracefully.
+It has no UI dependency (python-pptx only), so it also runs in worker processes;
+see export_service.py.
 """
 from __future__ import annotations
 from pptx import Presentation
 from pptx.enum.shapes import PP_PLACEHOLDER, MSO_SHAPE
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.util import Inches, Pt
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
 from pptx.dml.color import RGBColor
 from io import BytesIO
 from datetime import datetime
-import numpy as np
-import streamlit as st
+from collections import OrderedDict
+import threading
+
+import metrics
+# defined next to the pre-renderer, which hashes states without loading python-pptx
+from export_service import EXPORT_FIELDS, state_hash  # noqa: F401  (re-exported)
 
 W, H = Inches(13.333), Inches(7.5)
 MARGIN = Inches(0.8)
@@ -67,7 +79,6 @@ def is_blank(layout) -> bool:
     return len(types) == 0 or types.issubset(META_TYPES)
 
 def _add_title(prs, title, subtitle=None):
-    st.write(title)
     # helper: does a layout truly have a title placeholder?
     def has_title(layout):
         for ph in layout.placeholders:
@@ -206,10 +217,10 @@ def _add_small_label(slide, text: str, left, top,angle_deg: float = 0):
 
 # ---------------------------- Slide builders ----------------------------
 
-def slide_agenda(prs: Presentation, items: Optional[List[str]] = None):
+def slide_agenda(prs: Presentation, items: Optional[List[str]] = None, layout=None):
     #blank = next((l for l in prs.slide_layouts if len(l.placeholders) == 0), prs.slide_layouts[0])
     #slide = prs.slides.add_slide(blank)
-    layout = next((l for l in prs.slide_layouts if has_body(l)), prs.slide_layouts[0])
+    layout = layout or next((l for l in prs.slide_layouts if has_body(l)), prs.slide_layouts[0])
     slide = prs.slides.add_slide(layout)
     _add_heading(slide, "Agenda")
     _add_bullets(slide, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(5.0), items or [
@@ -220,8 +231,8 @@ def slide_agenda(prs: Presentation, items: Optional[List[str]] = None):
     ])
     return slide
 
-def slide_exec_snapshot(prs: Presentation, bullets: List[str]):
-    layout = next((l for l in prs.slide_layouts if has_body(l)), prs.slide_layouts[0])
+def slide_exec_snapshot(prs: Presentation, bullets: List[str], layout=None):
+    layout = layout or next((l for l in prs.slide_layouts if has_body(l)), prs.slide_layouts[0])
     slide = prs.slides.add_slide(layout)
     _add_heading(slide, "Executive Snapshot")
     _add_bullets(slide, MARGIN, Inches(1.2), W - 2*MARGIN, Inches(5.0), bullets)
@@ -270,43 +281,84 @@ def slide_ansoff(prs: Presentation, ansoff: Dict[str, List[str]]):
     return slide
 
 
+BENCH_ROWS_PER_SLIDE = 12  # body rows; longer tables continue on "(cont.)" slides
+
+_A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_XML_INVALID = {c: None for c in range(32) if c not in (9, 10)}
+# Same markup python-pptx produces for `cell.text = ...` (+ bold runs / solid fill on the header)
+_TC_HEADER = ('<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{}</a:txBody>'
+              '<a:tcPr><a:solidFill><a:srgbClr val="{}"/></a:solidFill></a:tcPr></a:tc>')
+_TC_BODY = '<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{}</a:txBody><a:tcPr/></a:tc>'
+
+
+def _cell_paragraphs(text: Any, bold: bool = False) -> str:
+    from xml.sax.saxutils import escape
+
+    rpr = '<a:rPr b="1"/>' if bold else ""
+    lines = str(text).translate(_XML_INVALID).split("\n")
+    return "".join(f"<a:p><a:r>{rpr}<a:t>{escape(line)}</a:t></a:r></a:p>" if line else "<a:p/>" for line in lines)
+
+
+def _table_rows_xml(header: List[str], rows: List[List[Any]], heights: List[str]) -> str:
+    fill = str(COLOR_LIGHT)
+    out = [f'<a:tr h="{heights[0]}">' + "".join(_TC_HEADER.format(_cell_paragraphs(h, bold=True), fill) for h in header) + "</a:tr>"]
+    for row, h in zip(rows, heights[1:]):
+        out.append(f'<a:tr h="{h}">' + "".join(_TC_BODY.format(_cell_paragraphs(v)) for v in row) + "</a:tr>")
+    return "".join(out)
+
+
+def _add_table_fast(slide, header: List[str], rows: List[List[Any]], left, top, width, height):
+    """add_table() for the frame/grid, then all rows emitted as one XML string and parsed once."""
+    from pptx.oxml import parse_xml
+
+    # a 1-row table gives the frame, style and column grid; its row is replaced
+    shape = slide.shapes.add_table(1, len(header), left, top, width, height)
+    tbl = shape._element.graphic.graphicData.tbl
+    for tr in tbl.findall(f"{{{_A_NS}}}tr"):
+        tbl.remove(tr)
+    # row heights as python-pptx splits them: equal, last row absorbs the remainder
+    n = 1 + len(rows)
+    heights = [str(int(height) // n)] * (n - 1) + [str(int(height) - (n - 1) * (int(height) // n))]
+    parsed = parse_xml(f'<a:tbl xmlns:a="{_A_NS}">{_table_rows_xml(header, rows, heights)}</a:tbl>')
+    for tr in list(parsed):
+        tbl.append(tr)
+    return shape
+
+
 def slide_benchmark(prs: Presentation, company: str, bench: Dict[str, Any]):
     table = bench.get("table") or []
     peers = bench.get("peers") or []
     if not table:
         return None
-    cols = 2 + len(peers)  # Capability + company + peers
-    rows = 1 + len(table)
-
-    slide = prs.slides.add_slide(prs.slide_layouts[5])
-    _add_heading(slide, "Competitor Benchmark")
 
+    hdrs = ["Capability", company] + peers
+    body = [[row.get("capability", "")] + [row.get(company, "")] + [row.get(p, "") for p in peers] for row in table]
     left, top, width, height = MARGIN, Inches(1.2), W - 2*MARGIN, Inches(5.2)
-    shape = slide.shapes.add_table(rows, cols, left, top, width, height)
-    tbl = shape.table
 
-    # Header
-    hdrs = ["Capability", company] + peers
-    for j, h in enumerate(hdrs):
-        cell = tbl.cell(0, j)
-        cell.text = h
-        for p in cell.text_frame.paragraphs:
-            for r in p.runs:
-                r.font.bold = True
-        cell.fill.solid(); cell.fill.fore_color.rgb = COLOR_LIGHT
-
-    # Body
-    for i, row in enumerate(table, start=1):
-        vals = [row.get("capability", "")] + [row.get(company, "")] + [row.get(p, "") for p in peers]
-        for j, val in enumerate(vals):
-            tbl.cell(i, j).text = str(val)
+    first = None
+    for start in range(0, len(body), BENCH_ROWS_PER_SLIDE):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        _add_heading(slide, "Competitor Benchmark" + (" (cont.)" if start else ""))
+        _add_table_fast(slide, hdrs, body[start:start + BENCH_ROWS_PER_SLIDE], left, top, width, height)
+        first = first or slide
+    return first
 
-    return slide
 
+REC_ROW_H = Inches(0.5)
+REC_MIN_ROW_H = Inches(0.4)  # a crowded quadrant tightens its rows down to this before paginating
+REC_PAD = Inches(0.12)
 
-def slide_recommendations(prs: Presentation, recs: List[Dict[str, Any]]):
+def _rec_quadrant(impact: int, effort: int) -> int:
+    # TL (Q1): high impact (>=4), low effort (<=3)
+    # TR (Q2): high impact, high effort (>3)
+    # BL (Q3): low impact (<4), low effort (<=3)
+    # BR (Q4): low impact, high effort (>3)
+    return (0 if impact >= 4 else 2) + (1 if effort > 3 else 0)
+
+
+def _recs_grid_slide(prs: Presentation, title: str):
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    _add_heading(slide, "Top 5 Recommendations — Impact × Effort")
+    _add_heading(slide, title)
 
     grid_left, grid_top = MARGIN, Inches(2)
     grid_w, grid_h = W - 2*MARGIN, Inches(4.6)
@@ -316,47 +368,48 @@ def slide_recommendations(prs: Presentation, recs: List[Dict[str, Any]]):
     _add_small_label(slide, "Impact ->", grid_left - Inches(1.1), grid_top + grid_h - Inches(1.0), angle_deg=270)
     _add_small_label(slide, "Effort ->", grid_left + grid_w - Inches(0.8), grid_top + grid_h + Inches(0.05),angle_deg=0)
 
-    # Place recs into quadrants
-    #top = 0
-    for idx, rec in enumerate((recs or [])[:10], start=1):
-        title = rec.get("title", f"Rec {idx}")
-        impact = int(rec.get("impact", 3))
-        effort = int(rec.get("effort", 3))
-        # Determine quadrant (simple thresholds)
-        # TL (Q1): high impact (>=4), low effort (<=3)
-        # TR (Q2): high impact, high effort (>3)
-        # BL (Q3): low impact (<4), low effort (<=3)
-        # BR (Q4): low impact, high effort (>3)
-        if impact >= 4 and effort <= 3:
-            quad = q[0]
-        elif impact >= 4 and effort > 3:
-            quad = q[1]
-        elif impact < 4 and effort <= 3:
-            quad = q[2]
-        else:
-            quad = q[3]
-        l, t, w, h = quad
-        left   = l + Inches(0.12)
-        top    = t + Inches(0.12)
-        width  = w - Inches(0.24)
-        height = Inches(0.5)
-        tol = Inches(0.05)
-        gap = Inches(0.10)
-        for shp in prs.slides[-1].shapes:
-            #st.write(title, "left:", left, "shape left:", shp.left, "top:", top, "shape top:", shp.top)
-            # horizontal overlap with our column
-            if abs(left - shp.left) <= 1 and abs(top - shp.top) <= 1:
-                top = shp.top + height
-                #st.write(title, "left:", left, "shape left:", shp.left, "new top:", top, "shape top:", shp.top)
-        box = prs.slides[-1].shapes.add_textbox(left, top, width, height)
-        tf = box.text_frame; tf.clear(); p = tf.paragraphs[0]
-        r = p.add_run(); r.text = f"{idx}. {title}"; r.font.size = BODY_SIZE; r.font.color.rgb = COLOR_DARK
-
     # Legend
     legend = slide.shapes.add_textbox(MARGIN, grid_top + grid_h + Inches(0.2), W - 2*MARGIN, Inches(0.6))
     tfl = legend.text_frame; tfl.clear()
     p = tfl.paragraphs[0]; r = p.add_run(); r.text = "Q1: Quick Wins   Q2: Strategic Bets   Q3: Fill-ins   Q4: Long Shots"; r.font.size = Pt(12); r.font.color.rgb = COLOR_MED
-    return slide
+    return slide, q
+
+
+def slide_recommendations(prs: Presentation, recs: List[Dict[str, Any]]):
+    """Impact × Effort grid. Each quadrant has a fixed number of row slots; a
+    recommendation takes the next free slot of its quadrant, and a full quadrant
+    continues on a "(cont.)" slide with the same grid. A quadrant holding more
+    items than fit at REC_ROW_H tightens to REC_MIN_ROW_H first, so the default
+    five quick wins stay on one slide. Placement is O(1) per item.
+    """
+    recs = recs or []
+    title = (f"Top {len(recs)} " if recs else "") + "Recommendations — Impact × Effort"
+    quadrants = [_rec_quadrant(int(rec.get("impact", 3)), int(rec.get("effort", 3))) for rec in recs]
+    pages: List[Any] = []  # (slide, quadrant rects) per page
+    filled = [0, 0, 0, 0]  # items placed so far per quadrant, across pages
+    first, quads = _recs_grid_slide(prs, title)
+    pages.append((first, quads))
+
+    avail = quads[0][3] - 2*REC_PAD
+    loose, tight = max(1, int(avail // REC_ROW_H)), max(1, int(avail // REC_MIN_ROW_H))
+    per_quad, row_h = [], []
+    for qi in range(4):
+        rows = loose if quadrants.count(qi) <= loose else tight
+        per_quad.append(rows)
+        row_h.append(REC_ROW_H if rows == loose else int(avail // rows))
+
+    for idx, (rec, qi) in enumerate(zip(recs, quadrants), start=1):
+        rec_title = rec.get("title", f"Rec {idx}")
+        page, slot = divmod(filled[qi], per_quad[qi])
+        filled[qi] += 1
+        while page >= len(pages):
+            pages.append(_recs_grid_slide(prs, f"{title} (cont.)"))
+        slide, q = pages[page]
+        l, t, w, _h = q[qi]
+        box = slide.shapes.add_textbox(l + REC_PAD, t + REC_PAD + slot * row_h[qi], w - 2*REC_PAD, row_h[qi])
+        tf = box.text_frame; tf.clear(); p = tf.paragraphs[0]
+        r = p.add_run(); r.text = f"{idx}. {rec_title}"; r.font.size = BODY_SIZE; r.font.color.rgb = COLOR_DARK
+    return first
 
 
 def slide_appendix_json(prs: Presentation, title: str, text: str):
@@ -370,26 +423,155 @@ def slide_appendix_json(prs: Presentation, title: str, text: str):
         tf = box.text_frame; tf.word_wrap = True; tf.clear()
         p = tf.paragraphs[0]; r = p.add_run(); r.text = chunk; r.font.name = "Courier New"; r.font.size = MONO_SIZE; r.font.color.rgb = COLOR_DARK
 
-# ---------------------------- Orchestrator ----------------------------
 
-def build_ppt_from_state(state: Dict[str, Any]) -> (BytesIO, str):
-    """Return (pptx_bytes, filename) for download.
-    Expects keys in `state`: company, product, frameworks, results, recs
+# ---------------------------- Embedded analysis ----------------------------
+
+ANALYSIS_PARTNAME = "/mystrat/analysis.json"
+ANALYSIS_RELTYPE = "urn:mystrat:relationships:analysis"
+ANALYSIS_VERSION = 1
+
+def _analysis_blob(payload: Dict[str, Any]) -> bytes:
+    import json
+
+    return json.dumps({"version": ANALYSIS_VERSION, **payload}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def embed_analysis(prs: Presentation, payload: Dict[str, Any]) -> int:
+    """Store `payload` as one JSON part of the package (deflated by the zip writer),
+    related from the package root like docProps. Returns the JSON size in bytes.
     """
-    company = (state.get("company") or "Company").strip()
-    product = (state.get("product") or "Product").strip()
-    results = state.get("results") or {}
-    recs = state.get("recs") or []
+    blob = _analysis_blob(payload)
+    package = prs.part.package
+    part = Part(PackURI(ANALYSIS_PARTNAME), "application/json", package, blob)
+    package.relate_to(part, ANALYSIS_RELTYPE)
+    return len(blob)
 
-    prs = Presentation()
-    prs.slide_width, prs.slide_height = int(W), int(H)
 
-    # Title
-    date_str = datetime.now().strftime("%b %d, %Y")
-    _add_title(prs, f"{product} × {company}", f"Strategy Snapshot — {date_str}")
+def load_analysis(pptx: Any) -> Optional[Dict[str, Any]]:
+    """Read the analysis embedded by `build_ppt_from_state` back out of a deck.
+    `pptx` is a path, bytes or a binary file object; returns None for decks without one.
+    Only the zip directory and the one part are read (no python-pptx parsing).
+    """
+    import json
+    import zipfile
+
+    src = BytesIO(pptx) if isinstance(pptx, (bytes, bytearray)) else pptx
+    with zipfile.ZipFile(src) as zf:
+        try:
+            blob = zf.read(ANALYSIS_PARTNAME.lstrip("/"))
+        except KeyError:
+            return None
+    return json.loads(blob.decode("utf-8"))
 
-    # Agenda
-    slide_agenda(prs)
+
+def load_analyses(pptx: Any) -> List[Dict[str, Any]]:
+    """All analyses embedded in a deck: the single-analysis part or every portfolio part, in order."""
+    import json
+    import zipfile
+
+    src = BytesIO(pptx) if isinstance(pptx, (bytes, bytearray)) else pptx
+    with zipfile.ZipFile(src) as zf:
+        names = sorted(n for n in zf.namelist() if n.startswith("mystrat/") and n.endswith(".json"))
+        return [json.loads(zf.read(n).decode("utf-8")) for n in names]
+
+
+def slide_appendix_summary(prs: Presentation, payload: Dict[str, Any], size: int):
+    """One slide describing the embedded analysis, whatever its size."""
+    results = payload.get("results") or {}
+    swot = results.get("SWOT") or {}
+    ansoff = results.get("Ansoff") or {}
+    bullets = [
+        f"Frameworks: {', '.join(payload.get('frameworks') or []) or '—'}",
+        f"SWOT items: {sum(len(swot.get(k) or []) for k in ('S', 'W', 'O', 'T'))}",
+        f"Ansoff plays: {sum(len(v or []) for v in ansoff.values())}",
+        f"Benchmark rows: {len((results.get('Benchmark') or {}).get('table') or [])}",
+        f"Recommendations: {len(payload.get('recs') or [])}",
+        f"Full analysis JSON ({size / 1024:.1f} KB) is embedded in this file as {ANALYSIS_PARTNAME.lstrip('/')}",
+    ]
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    _add_heading(slide, "Appendix — Analysis Data")
+    _add_bullets(slide, MARGIN, Inches(1.5), W - 2*MARGIN, Inches(5.0), bullets)
+    return slide
+
+
+# ---------------------------- Compiled template ----------------------------
+
+_TITLE_SENTINEL = "{{deck_title}}"
+_SUBTITLE_SENTINEL = "{{deck_subtitle}}"
+
+class DeckTemplate:
+    """Base deck compiled once and reused for every export.
+
+    Holds the serialized 16:9 deck with the title and agenda slides already
+    built, plus the resolved layout indices, so an export only loads the bytes,
+    fills in the title text and adds the content slides.
+    """
+
+    def __init__(self, agenda: Optional[List[str]] = None):
+        prs = Presentation()
+        prs.slide_width, prs.slide_height = int(W), int(H)
+        layouts = list(prs.slide_layouts)
+        # layout name -> index in slide_layouts (identical in every clone)
+        self.layouts = {
+            "title": next((i for i, l in enumerate(layouts) if has_title(l)), 0),
+            "body": next((i for i, l in enumerate(layouts) if has_body(l)), 0),
+            "title_only": min(5, len(layouts) - 1),
+        }
+        self.layouts["section"] = next(
+            (i for i, l in enumerate(layouts) if "section" in (l.name or "").lower() and has_title(l)), self.layouts["title"]
+        )
+        _add_title(prs, _TITLE_SENTINEL, _SUBTITLE_SENTINEL)
+        slide_agenda(prs, agenda, layout=layouts[self.layouts["body"]])
+        bio = BytesIO()
+        prs.save(bio)
+        self.base = bio.getvalue()
+
+    def new_deck(self, title: str, subtitle: str) -> Presentation:
+        """A fresh Presentation cloned from the base deck, title slide filled in."""
+        prs = Presentation(BytesIO(self.base))
+        for shape in prs.slides[0].shapes:
+            if not shape.has_text_frame:
+                continue
+            if shape.text_frame.text == _TITLE_SENTINEL:
+                shape.text_frame.text = title
+            elif shape.text_frame.text == _SUBTITLE_SENTINEL:
+                shape.text_frame.text = subtitle
+        return prs
+
+    def layout(self, prs: Presentation, name: str):
+        return prs.slide_layouts[self.layouts[name]]
+
+
+_TEMPLATE: Optional[DeckTemplate] = None
+_TEMPLATE_LOCK = threading.Lock()
+
+def get_template() -> DeckTemplate:
+    """The process-wide compiled template (built on first use)."""
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        with _TEMPLATE_LOCK:
+            if _TEMPLATE is None:
+                _TEMPLATE = DeckTemplate()
+    return _TEMPLATE
+
+# ---------------------------- Orchestrator ----------------------------
+
+def _analysis_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "analysis_id": state.get("analysis_id"),
+        "company": (state.get("company") or "Company").strip(),
+        "product": (state.get("product") or "Product").strip(),
+        "geo": state.get("geo"),
+        "notes": state.get("notes"),
+        "frameworks": state.get("frameworks", []),
+        "results": state.get("results") or {},
+        "recs": state.get("recs") or [],
+    }
+
+
+def _add_analysis_slides(prs: Presentation, payload: Dict[str, Any], template: "DeckTemplate") -> None:
+    """Executive snapshot + framework + recommendation slides for one analysis."""
+    company, results, recs = payload["company"], payload["results"], payload["recs"]
 
     # Executive Snapshot (basic heuristic based on SWOT + Ansoff presence)
     snapshot: List[str] = []
@@ -403,45 +585,227 @@ def build_ppt_from_state(state: Dict[str, Any]) -> (BytesIO, str):
         snapshot.append("Focus: Execute 1–2 high‑impact Ansoff plays next quarter.")
     if recs:
         snapshot.append(f"Top priority: {recs[0].get('title','First recommendation')}")
-    slide_exec_snapshot(prs, snapshot[:6])
+    with metrics.span("pptx.slide", builder="exec_snapshot"):
+        slide_exec_snapshot(prs, snapshot[:6], layout=template.layout(prs, "body"))
 
     # SWOT
     if swot:
-        slide_swot(prs, swot)
+        with metrics.span("pptx.slide", builder="swot"):
+            slide_swot(prs, swot)
 
     # Ansoff
     ansoff = results.get("Ansoff") or {}
     if ansoff:
-        slide_ansoff(prs, ansoff)
+        with metrics.span("pptx.slide", builder="ansoff"):
+            slide_ansoff(prs, ansoff)
 
     # Benchmark
     bench = results.get("Benchmark") or {}
     if bench.get("table"):
-        slide_benchmark(prs, company, bench)
+        with metrics.span("pptx.slide", builder="benchmark", rows=len(bench["table"])):
+            slide_benchmark(prs, company, bench)
 
     # Recommendations
     if recs:
-        slide_recommendations(prs, recs)
+        with metrics.span("pptx.slide", builder="recommendations", recs=len(recs)):
+            slide_recommendations(prs, recs)
 
-    # Appendix with raw JSON (trimmed)
-    import json
-    raw = json.dumps({
-        "frameworks": state.get("frameworks", []),
-        "results": results,
-        "recs": recs,
-    }, indent=2, ensure_ascii=False)
-    slide_appendix_json(prs, "Appendix — Raw Analysis JSON", raw)
 
-    # Serialize
-    bio = BytesIO()
-    prs.save(bio)
-    bio.seek(0)
+def build_ppt_from_state(state: Dict[str, Any]) -> (BytesIO, str):
+    """Return (pptx_bytes, filename) for download.
+    Expects keys in `state`: company, product, frameworks, results, recs
+    """
+    with metrics.span("pptx.build") as sp:
+        payload = _analysis_payload(state)
+        company, product = payload["company"], payload["product"]
+
+        # Title + Agenda come pre-built in the compiled template
+        with metrics.span("pptx.template"):
+            template = get_template()
+            date_str = datetime.now().strftime("%b %d, %Y")
+            prs = template.new_deck(f"{product} × {company}", f"Strategy Snapshot — {date_str}")
+
+        _add_analysis_slides(prs, payload, template)
+
+        # Appendix: raw analysis embedded as a package part + one summary slide
+        with metrics.span("pptx.embed"):
+            size = embed_analysis(prs, payload)
+            slide_appendix_summary(prs, payload, size)
+
+        # Serialize
+        with metrics.span("pptx.save"):
+            bio = BytesIO()
+            prs.save(bio)
+            bio.seek(0)
+        sp.set(**_deck_metrics(prs, bio.getbuffer().nbytes, "single"))
 
     safe_company = company.replace(" ", "_")
     safe_product = product.replace(" ", "_")
     fname = f"{safe_company}_{safe_product}_{datetime.now().strftime('%Y%m%d')}_strategy.pptx"
     return bio, fname
 
+# ---------------------------- Portfolio deck ----------------------------
+
+PORTFOLIO_AGENDA = ["Portfolio overview", "One section per analysis: snapshot, frameworks, recommendations", "Analysis data (embedded)"]
+
+class _SpooledPart(Part):
+    """A finished part whose serialized XML lives in a temp file until save.
+
+    Slide parts are switched to this class once their analysis is complete, which
+    releases the lxml tree; relationships and partname stay on the same object,
+    so the package graph (and slide renumbering on save) is unchanged.
+    """
+
+    def spool(self, blob: bytes, spool: Any) -> None:
+        self._spool = spool
+        self._offset = spool.seek(0, 2)
+        self._length = spool.write(blob)
+
+    @property
+    def blob(self) -> bytes:
+        self._spool.seek(self._offset)
+        return self._spool.read(self._length)
+
+
+def _spool_part(part: Any, spool: Any) -> None:
+    blob = part.blob
+    part.__class__ = _SpooledPart
+    part.__dict__.pop("_element", None)
+    part.__dict__.pop("slide", None)  # cached Slide proxy would keep the tree alive
+    part.spool(blob, spool)
+
+
+def build_portfolio(
+    states: Iterable[Dict[str, Any]],
+    path: str,
+    *,
+    title: str = "Portfolio Review",
+    embed: bool = True,
+) -> Dict[str, Any]:
+    """Render many analyses into one deck at `path` (one master, one section per analysis).
+
+    `states` is consumed lazily; each analysis's slides (and embedded JSON) are
+    serialized to a temp spool as soon as they are finished, so memory stays
+    flat however many analyses there are. The zip is written straight to `path`.
+    """
+    import os
+    import tempfile
+
+    with metrics.span("pptx.portfolio") as sp:
+        template = DeckTemplate(agenda=PORTFOLIO_AGENDA)
+        date_str = datetime.now().strftime("%b %d, %Y")
+        prs = template.new_deck(title, f"{date_str}")
+        package = prs.part.package
+        done = 0
+        with tempfile.TemporaryFile(prefix="portfolio-") as spool:
+            for payload in map(_analysis_payload, states):
+                done += 1
+                start = len(prs.slides._sldIdLst)
+                section = prs.slides.add_slide(template.layout(prs, "section"))
+                _add_heading(section, f"{payload['product']} × {payload['company']}")
+                _add_analysis_slides(prs, payload, template)
+                if embed:
+                    part = _SpooledPart(PackURI(f"/mystrat/analyses/{done:05d}.json"), "application/json", package)
+                    part.spool(_analysis_blob(payload), spool)
+                    package.relate_to(part, ANALYSIS_RELTYPE)
+                for sld_id in list(prs.slides._sldIdLst)[start:]:
+                    _spool_part(prs.part.related_part(sld_id.rId), spool)
+            tmp = f"{path}.tmp"
+            with metrics.span("pptx.save"):
+                prs.save(tmp)
+            os.replace(tmp, path)
+            slides = len(prs.slides._sldIdLst)
+        nbytes = os.path.getsize(path)
+        # spooled slides no longer have shapes to count
+        sp.set(analyses=done, slides=slides, bytes=nbytes)
+        metrics.observe("mystrat_deck_bytes", nbytes, buckets=metrics.SIZE_BUCKETS, kind="portfolio")
+    return {"path": path, "analyses": done, "slides": slides, "bytes": nbytes}
+
+def _deck_metrics(prs: Presentation, nbytes: int, kind: str) -> Dict[str, int]:
+    """Slide/shape counts and size of a rendered deck, recorded as histograms; returns them."""
+    slides = list(prs.slides)
+    out = {"slides": len(slides), "shapes": sum(len(s.shapes) for s in slides), "bytes": nbytes}
+    metrics.observe("mystrat_deck_bytes", nbytes, buckets=metrics.SIZE_BUCKETS, kind=kind)
+    metrics.observe("mystrat_deck_slides", out["slides"], buckets=metrics.COUNT_BUCKETS, kind=kind)
+    metrics.observe("mystrat_deck_shapes", out["shapes"], buckets=metrics.COUNT_BUCKETS, kind=kind)
+    return out
+
+# ---------------------------- Rendered deck cache ----------------------------
+
+class DeckCache:
+    """Bounded LRU of rendered decks: state_hash -> (pptx bytes, filename)."""
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+        metrics.inc("mystrat_cache_total", cache="deck", result="miss" if item is None else "hit")
+        return item
+
+    def put(self, key: str, data: bytes, fname: str) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._items[key] = (data, fname)
+            self._bytes += len(data)
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (evicted, _) = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get_or_render(self, key: str, render: Callable[[], Tuple[bytes, str]]) -> Tuple[bytes, str]:
+        """The cached deck for `key`, else `render()` it and cache the result. One
+        render per key: a caller that finds it in flight (e.g. a background
+        pre-render) waits for it instead of rendering the same deck again."""
+        while True:
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+            with self._lock:
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[key] = threading.Event()
+            if not owner:
+                event.wait()
+                continue
+            try:
+                data, fname = render()
+                self.put(key, data, fname)
+                return data, fname
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+_DECK_CACHE = DeckCache()
+
+def build_ppt_cached(state: Dict[str, Any], cache: Optional[DeckCache] = None) -> Tuple[bytes, str]:
+    """(pptx bytes, filename), rendered only when the exported content changed."""
+    def _render() -> Tuple[bytes, str]:
+        bio, fname = build_ppt_from_state(state)
+        return bio.getvalue(), fname
+
+    return (cache or _DECK_CACHE).get_or_render(state_hash(state), _render)
+
 # ---------------------------- Manual test ----------------------------
 if __name__ == "__main__":  # pragma: no cover
     sample_state = {
@@ -470,6 +834,14 @@ if __name__ == "__main__":  # pragma: no cover
             {"title": "Security Proof Pack", "impact": 3, "effort": 2},
         ],
     }
+    # the offline default recommendations (all quick wins) must fit on one grid slide
+    from generate import _heuristic_recs
+
+    check = Presentation()
+    check.slide_width, check.slide_height = int(W), int(H)
+    slide_recommendations(check, _heuristic_recs({}, 5))
+    assert len(check.slides) == 1, f"default recs spilled onto {len(check.slides)} slides"
+
     bio, name = build_ppt_from_state(sample_state)
     with open(name, "wb") as f:
         f.write(bio.getvalue())
@@ -0,0 +1,225 @@
+"""
+Process-pool PPTX export service on top of export_ppt.
+
+- python-pptx rendering is CPU-bound and holds the GIL; the service spreads it
+  over worker processes (default: one per core)
+- Workers import export_ppt and compile the deck template once, at start-up
+- `render()` returns (bytes, filename); `render_to_file()` writes in the worker
+  and returns only the path, so large decks never cross the process boundary
+- `render_many()` fans a list of states out and returns results in input order
+- `prerender()` renders the deck for the current state on a background thread
+  (into export_ppt's deck cache) while the user is still reviewing, so Export
+  usually finds the bytes ready
+
+Usage:
+
+    from export_service import get_export_service
+    svc = get_export_service()                       # shared per process
+    data, fname = svc.render(state)
+    paths = svc.render_many(states, out_dir="decks")
+
+Workers use the "spawn" start method by default: forking a process that already
+runs threads (Streamlit, thread-pool batch runs) can deadlock.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+
+EXPORT_FIELDS = ("analysis_id", "company", "product", "geo", "notes", "frameworks", "results", "recs")
+
+
+def state_hash(state: Dict[str, Any]) -> str:
+    """Stable hash of everything that ends up in the deck (incl. the date on the title slide)."""
+    payload = {k: state.get(k) for k in EXPORT_FIELDS}
+    payload["date"] = datetime.now().strftime("%Y%m%d")
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# ---------------------- Worker side ----------------------
+
+def _init_worker() -> None:
+    from export_ppt import get_template
+
+    get_template()
+
+
+def _render(state: Dict[str, Any]) -> Tuple[bytes, str]:
+    from export_ppt import build_ppt_from_state
+
+    bio, fname = build_ppt_from_state(state)
+    return bio.getvalue(), fname
+
+
+def _render_to_file(state: Dict[str, Any], path: Optional[str], out_dir: Optional[str]) -> str:
+    data, fname = _render(state)
+    if path is None:
+        path = os.path.join(out_dir or ".", fname)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+# ---------------------- Service ----------------------
+
+class ExportService:
+    """Renders decks in a pool of worker processes.
+
+    `max_workers=0` renders in the calling process (no pool), which keeps the
+    same API for tests and single-core hosts.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, *, start_method: str = "spawn"):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if self.max_workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+            )
+
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            fut: Future = Future()
+            try:
+                fut.set_result(fn(*args))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        return self._executor.submit(fn, *args)
+
+    def submit(self, state: Dict[str, Any]) -> Future:
+        """Future of (pptx bytes, filename)."""
+        return self._submit(_render, state)
+
+    def submit_to_file(self, state: Dict[str, Any], path: Optional[str] = None, *, out_dir: Optional[str] = None) -> Future:
+        """Future of the written path (`path`, or `out_dir`/<default filename>)."""
+        return self._submit(_render_to_file, state, path, out_dir)
+
+    def render(self, state: Dict[str, Any]) -> Tuple[bytes, str]:
+        return self.submit(state).result()
+
+    def render_to_file(self, state: Dict[str, Any], path: Optional[str] = None, *, out_dir: Optional[str] = None) -> str:
+        return self.submit_to_file(state, path, out_dir=out_dir).result()
+
+    def render_many(
+        self, states: Sequence[Dict[str, Any]], *, out_dir: Optional[str] = None
+    ) -> List[Union[Tuple[bytes, str], str]]:
+        """Render all states in parallel; (bytes, filename) each, or paths when `out_dir` is set."""
+        if out_dir is not None:
+            futures = [self.submit_to_file(s, out_dir=out_dir) for s in states]
+        else:
+            futures = [self.submit(s) for s in states]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self) -> "ExportService":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+
+
+_LOCK = threading.Lock()
+_SERVICE: Optional[ExportService] = None
+
+
+def get_export_service(max_workers: Optional[int] = None) -> ExportService:
+    """The process-wide service (created on first use; MYSTRAT_EXPORT_WORKERS overrides the size)."""
+    global _SERVICE
+    with _LOCK:
+        if _SERVICE is None:
+            if max_workers is None and os.getenv("MYSTRAT_EXPORT_WORKERS"):
+                max_workers = int(os.environ["MYSTRAT_EXPORT_WORKERS"])
+            _SERVICE = ExportService(max_workers)
+        return _SERVICE
+
+
+def shutdown_export_service() -> None:
+    global _SERVICE
+    with _LOCK:
+        if _SERVICE is not None:
+            _SERVICE.shutdown()
+            _SERVICE = None
+
+
+# ---------------------- Background pre-render ----------------------
+
+class DeckPrerenderer:
+    """Renders decks ahead of the Export step on one daemon thread.
+
+    Submissions are snapshots keyed by analysis id; a newer snapshot replaces a
+    queued older one, so a burst of edits renders only the latest. Results land
+    in export_ppt's deck cache, where `build_ppt_cached()` picks them up (or
+    waits for a render still in flight). A state whose `state_hash` was already
+    submitted is skipped before it is copied, so plain reruns cost one hash.
+    """
+
+    def __init__(self, max_ids: int = 256) -> None:
+        self.max_ids = max_ids
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._submitted: "OrderedDict[str, str]" = OrderedDict()  # analysis id -> last submitted state_hash
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.rendered = 0
+        self.errors = 0
+
+    def submit(self, state: Dict[str, Any]) -> None:
+        key = str(state.get("analysis_id") or "")
+        digest = state_hash(state)
+        with self._cond:
+            if self._submitted.get(key) == digest:
+                return
+        snapshot = copy.deepcopy(dict(state))  # the UI keeps mutating `state`
+        with self._cond:
+            self._submitted.pop(key, None)
+            self._submitted[key] = digest
+            while len(self._submitted) > self.max_ids:
+                self._submitted.popitem(last=False)
+            self._pending.pop(key, None)
+            self._pending[key] = snapshot
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="deck-prerender", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        from export_ppt import build_ppt_cached  # python-pptx loads here, off the script thread
+
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                _, snapshot = self._pending.popitem(last=False)
+            try:
+                build_ppt_cached(snapshot)
+                self.rendered += 1
+            except Exception:
+                self.errors += 1  # Export renders (and reports) it again in the foreground
+
+
+_PRERENDERER = DeckPrerenderer()
+
+
+def prerender(state: Dict[str, Any]) -> None:
+    """Queue a background render of `state`'s deck (no-op work if it is already cached)."""
+    if state.get("results"):
+        _PRERENDERER.submit(state)
@@ -22,17 +22,136 @@ Usage (in Streamlit button handler):
     )
     state["results"].update(results)
 
+    # Frameworks are independent LLM calls; StrategyGenerator(provider, max_workers=4)
+    # runs them in parallel so wall-clock time ~= the slowest framework.
+
     # Optional: auto-generate recommendations
     state["recs"] = gen.generate_recommendations(state["results"], constraints={})
 
+Async (many analyses on one event loop):
+
+    gen = StrategyGenerator(AsyncOpenAIProvider(model="gpt-4o-mini"))
+    results = await asyncio.gather(*(gen.agenerate_selected_frameworks(**row) for row in rows))
+
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
+import queue
 import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import metrics
+
+# ---------------------- Token accounting ----------------------
+
+# per-process totals of what each call used, from the API's `usage` field or,
+# when a response carries none, from `estimate_tokens`
+_TOKEN_TOTALS: Dict[str, int] = {}
+_TOKEN_BY_MODEL: Dict[str, Dict[str, int]] = {}
+_TOKEN_CALLS: deque = deque(maxlen=1000)
+_TOKEN_LOCK = threading.Lock()
+# finish_reason of the last call recorded in this thread / task ("length" = cut at max_tokens)
+_FINISH_REASON: ContextVar[Optional[str]] = ContextVar("mystrat_finish_reason", default=None)
+# usage record of the last provider call in this thread / task (see record_usage)
+_LAST_USAGE: ContextVar[Optional[Dict[str, Any]]] = ContextVar("mystrat_last_usage", default=None)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); used for prompt budgets and
+    for responses that report no usage."""
+    return (len(text) + 3) // 4
+
+def record_usage(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0,
+    *,
+    max_tokens: Optional[int] = None,
+    estimated: bool = False,
+    truncated: bool = False,
+) -> Dict[str, Any]:
+    """Add one call to the process totals; returns the per-call record."""
+    call = {
+        "model": model,
+        "prompt_tokens": int(prompt_tokens),
+        "completion_tokens": int(completion_tokens),
+        "cached_tokens": int(cached_tokens),
+        "max_tokens": max_tokens,
+        "estimated": estimated,
+        "truncated": truncated,
+    }
+    counts = {
+        "calls": 1,
+        "prompt_tokens": call["prompt_tokens"],
+        "completion_tokens": call["completion_tokens"],
+        "cached_tokens": call["cached_tokens"],
+        "estimated_calls": int(estimated),
+        "truncated_calls": int(truncated),
+    }
+    with _TOKEN_LOCK:
+        per_model = _TOKEN_BY_MODEL.setdefault(model, {})
+        for k, v in counts.items():
+            _TOKEN_TOTALS[k] = _TOKEN_TOTALS.get(k, 0) + v
+            per_model[k] = per_model.get(k, 0) + v
+        _TOKEN_CALLS.append(call)
+    for kind in ("prompt", "completion", "cached"):
+        metrics.inc("mystrat_llm_tokens_total", call[f"{kind}_tokens"], model=model, kind=kind)
+    if truncated:
+        metrics.inc("mystrat_llm_truncated_total", model=model)
+    return call
+
+def token_usage_stats() -> Dict[str, Any]:
+    """Token totals for this process, overall and by model."""
+    with _TOKEN_LOCK:
+        return {**_TOKEN_TOTALS, "by_model": {m: dict(c) for m, c in _TOKEN_BY_MODEL.items()}}
+
+def recent_token_usage(n: int = 100) -> List[Dict[str, Any]]:
+    """The last `n` per-call records, oldest first."""
+    with _TOKEN_LOCK:
+        return list(_TOKEN_CALLS)[-n:]
+
+def last_finish_reason() -> Optional[str]:
+    """finish_reason of the last provider call made in this thread / task, if it reported one."""
+    return _FINISH_REASON.get()
+
+def clear_finish_reason() -> None:
+    _FINISH_REASON.set(None)
+
+def last_usage() -> Optional[Dict[str, Any]]:
+    """The record_usage() record of the last provider call made in this thread / task."""
+    return _LAST_USAGE.get()
+
+def clear_last_usage() -> None:
+    _LAST_USAGE.set(None)
+
+def _record_response_usage(
+    model: str, usage: Any, system_prompt: str, user_prompt: str, text: str, finish_reason: Optional[str], max_tokens: int
+) -> None:
+    _FINISH_REASON.set(finish_reason)
+    truncated = finish_reason == "length"
+    if usage is None:
+        call = record_usage(
+            model, estimate_tokens(system_prompt) + estimate_tokens(user_prompt), estimate_tokens(text),
+            max_tokens=max_tokens, estimated=True, truncated=truncated,
+        )
+    else:
+        details = getattr(usage, "prompt_tokens_details", None)
+        call = record_usage(
+            model, usage.prompt_tokens or 0, usage.completion_tokens or 0, getattr(details, "cached_tokens", 0) or 0,
+            max_tokens=max_tokens, truncated=truncated,
+        )
+    _LAST_USAGE.set(call)
 
 # ---------------------- LLM Provider Abstraction ----------------------
 
@@ -40,29 +159,140 @@ class LLMProvider:
     def complete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
         raise NotImplementedError
 
+    async def acomplete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        """Async completion. The default runs `complete` in a worker thread;
+        async-native providers override this.
+        """
+        return await asyncio.to_thread(
+            self.complete, system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+        )
+
+    async def complete_many(
+        self,
+        requests: Sequence[Tuple[str, str]],
+        *,
+        temperature: float = 0.2,
+        max_tokens: int = 1200,
+        concurrency: int = 16,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Complete a batch of (system_prompt, user_prompt) pairs on one event loop.
+        At most `concurrency` requests are in flight; results keep input order.
+        With `return_exceptions` a failed request yields its exception instead of
+        cancelling the batch.
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(system_prompt: str, user_prompt: str) -> str:
+            async with sem:
+                return await self.acomplete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+
+        return await asyncio.gather(*(_one(sp, up) for sp, up in requests), return_exceptions=return_exceptions)
+
+    def stream(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> Iterator[str]:
+        """Yield the completion in text chunks. The default yields `complete` in one piece;
+        providers with server-side streaming override this.
+        """
+        yield self.complete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+
 class OpenAIProvider(LLMProvider):
     """OpenAI chat completions provider. Requires `openai` >= 1.0.0.
     Set OPENAI_API_KEY in env or pass api_key.
     """
-    def __init__(self, model: str = "gpt-4o-mini", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        api_key: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        http_client: Any = None,
+    ):
         try:
             from openai import OpenAI  # type: ignore
         except Exception as e:
             raise RuntimeError("OpenAI Python SDK not installed. `pip install openai`.") from e
         self._OpenAI = OpenAI
         self.model = model
-        self.client = self._OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        # max_retries=0 leaves retrying to ratelimit.RateLimitedProvider; None keeps the SDK default
+        self._client_opts: Dict[str, Any] = {} if max_retries is None else {"max_retries": max_retries}
+        # http_client: a shared, pool-sized httpx client (see providers.py); None = SDK default
+        extra = {} if http_client is None else {"http_client": http_client}
+        self.client = self._OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), **self._client_opts, **extra)
 
     def complete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
         resp = self.client.chat.completions.create(
             model=self.model,
             temperature=temperature,
+            max_tokens=max_tokens,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
         )
-        return resp.choices[0].message.content or ""
+        text = resp.choices[0].message.content or ""
+        _record_response_usage(
+            self.model, getattr(resp, "usage", None), system_prompt, user_prompt, text, resp.choices[0].finish_reason, max_tokens
+        )
+        return text
+
+    def stream(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> Iterator[str]:
+        chunks = self.client.chat.completions.create(
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            stream=True,
+            stream_options={"include_usage": True},  # usage arrives on a final chunk with no choices
+        )
+        parts: List[str] = []
+        usage = finish_reason = None
+        try:
+            for chunk in chunks:
+                usage = getattr(chunk, "usage", None) or usage
+                if chunk.choices:
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+        finally:
+            _record_response_usage(self.model, usage, system_prompt, user_prompt, "".join(parts), finish_reason, max_tokens)
+
+class AsyncOpenAIProvider(OpenAIProvider):
+    """OpenAIProvider whose `acomplete` uses the SDK's `AsyncOpenAI` client, so
+    many requests share one event loop instead of a thread each. `complete`
+    still works through the sync client.
+    """
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        api_key: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        http_client: Any = None,
+        async_http_client: Any = None,
+    ):
+        super().__init__(model=model, api_key=api_key, max_retries=max_retries, http_client=http_client)
+        from openai import AsyncOpenAI  # type: ignore
+        # async_http_client: a shared, pool-sized httpx.AsyncClient (see providers.py); None = SDK default
+        extra = {} if async_http_client is None else {"http_client": async_http_client}
+        self.aclient = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), **self._client_opts, **extra)
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        resp = await self.aclient.chat.completions.create(
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        text = resp.choices[0].message.content or ""
+        _record_response_usage(
+            self.model, getattr(resp, "usage", None), system_prompt, user_prompt, text, resp.choices[0].finish_reason, max_tokens
+        )
+        return text
 
 # ---------------------- Utilities ----------------------
 
@@ -73,27 +303,303 @@ def _coerce_list(x: Any) -> List[str]:
         return [str(i).strip() for i in x if str(i).strip()]
     return [str(x).strip()] if str(x).strip() else []
 
-_JSON_BLOCK_RE = re.compile(r"\{[\s\S]*\}")
+_FENCE_RE = re.compile(r"```[\w+-]*[ \t]*\n?(.*?)(?:```|\Z)", re.S)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‟": '"', "‘": "'", "’": "'"})
+_JSON_REPAIRS: Dict[str, int] = {}
+_JSON_REPAIRS_LOCK = threading.Lock()
 
-def _extract_json(text: str) -> Dict[str, Any]:
-    """Try to parse JSON from the model output. Accepts raw JSON or fenced blocks.
-    Falls back to empty dict on failure.
+def _strip_trailing_commas(s: str) -> str:
+    """Drop commas directly before `}` / `]` (outside strings)."""
+    out: List[str] = []
+    in_str = esc = False
+    for ch in s:
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "}]":
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        out.append(ch)
+    return "".join(out)
+
+def _loads_repaired(candidate: str, repairs: List[str]) -> Tuple[bool, Any]:
+    try:
+        return True, json.loads(candidate)
+    except (ValueError, RecursionError):
+        pass
+    fixed = _strip_trailing_commas(candidate)
+    if fixed != candidate:
+        try:
+            value = json.loads(fixed)
+        except (ValueError, RecursionError):
+            return False, None
+        repairs.append("trailing_commas")
+        return True, value
+    return False, None
+
+_TRUNCATED_TRIES = 8  # still-open values tried per unbalanced candidate
+
+def _scan_json(text: str) -> Tuple[bool, Any, List[str]]:
+    """Find the first valid JSON object/array in `text` in one bracket-balanced pass.
+
+    Each candidate is scanned once (string- and escape-aware); a candidate that
+    fails to parse is skipped as a whole, so prose like "see {note}" before the
+    answer costs nothing extra. A value cut off by max_tokens is closed at the
+    last complete element ("truncated"); failing that, the values nested inside
+    it are tried without rescanning, which keeps the scan linear on unbalanced input.
     """
+    repairs: List[str] = []
+    deferred: Optional[Tuple[Any, List[str]]] = None
+    n, i = len(text), 0
+    while i < n:
+        start = min((p for p in (text.find("{", i), text.find("[", i)) if p >= 0), default=-1)
+        if start < 0:
+            break
+        stack: List[str] = []
+        opens: List[int] = []
+        closed: List[Tuple[int, int]] = []  # outermost balanced (start, end) spans nested in this candidate
+        in_str = esc = expect_value = False
+        # (end index, open depth) of the last complete element; every pop moves it, so
+        # stack[:depth] is still the open brackets there when the text runs out
+        safe: Optional[Tuple[int, int]] = None
+        j = start
+        while j < n:
+            ch = text[j]
+            if in_str:
+                if esc:
+                    esc = False
+                elif ch == "\\":
+                    esc = True
+                elif ch == '"':
+                    in_str = False
+                    if stack[-1] == "]" or expect_value:
+                        safe = (j + 1, len(stack))
+            elif ch == '"':
+                in_str = True
+            elif ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+                opens.append(j)
+                expect_value = False
+            elif ch in "}]":
+                stack.pop()
+                opened = opens.pop()
+                if not stack:
+                    break
+                while closed and closed[-1][0] > opened:
+                    closed.pop()
+                closed.append((opened, j))
+                safe = (j + 1, len(stack))
+            elif ch == ":":
+                expect_value = True
+            elif ch == ",":
+                expect_value = False
+                safe = (j, len(stack))
+            j += 1
+        if stack:
+            # ran off the end: nothing after `start` can balance. In text order, try
+            # each still-open value closed at the last complete element (at most
+            # _TRUNCATED_TRIES of them) and the complete values nested inside.
+            truncated = []
+            if safe is not None:
+                end, depth = safe
+                truncated = [
+                    (o, text[o:end] + "".join(reversed(stack[k:depth])))
+                    for k, o in enumerate(opens[:_TRUNCATED_TRIES]) if o < end
+                ]
+            candidates = sorted(truncated + [(lo, hi) for lo, hi in closed], key=lambda c: c[0])
+            i = n
+        else:
+            candidates, i = [(start, j)], j + 1
+        for lo, hi in candidates:
+            if isinstance(hi, str):
+                ok, value = _loads_repaired(hi, repairs)
+                if ok:
+                    return True, value, repairs + ["truncated"]
+                continue
+            ok, value = _loads_repaired(text[lo:hi + 1], repairs)
+            if ok and isinstance(value, list) and not any(isinstance(v, (dict, list)) for v in value):
+                # "[1]" / "[sic]"-style prose; keep it only if nothing better follows
+                deferred = deferred or (value, list(repairs))
+            elif ok:
+                if text[:lo].strip() or text[hi + 1:].strip():
+                    repairs.append("surrounding_text")
+                return True, value, repairs
+    if deferred is not None:
+        return True, deferred[0], deferred[1] + ["surrounding_text"]
+    return False, None, repairs
+
+def _extract_json_repaired(text: str) -> Tuple[Any, List[str]]:
+    """Parse model output into JSON, tolerating the usual defects.
+
+    Returns `(value, repairs)`; `repairs` names what had to be fixed
+    ("code_fence", "surrounding_text", "trailing_commas", "smart_quotes",
+    "truncated") and `value` is `{}` when nothing usable was found ("failed").
+    """
+    with metrics.span("parse.json", chars=len(text or "")):
+        return _repair_json(text)
+
+def _repair_json(text: str) -> Tuple[Any, List[str]]:
     if not text:
-        return {}
-    # Try direct parse first
+        return {}, ["failed"]
     try:
-        return json.loads(text)
-    except Exception:
+        return json.loads(text), []
+    except (ValueError, RecursionError):
         pass
-    # Look for the first JSON-looking block
-    m = _JSON_BLOCK_RE.search(text)
-    if m:
+    repairs: List[str] = []
+    body = text
+    m = _FENCE_RE.search(text)
+    if m and m.group(1).strip():
+        body = m.group(1)
+        repairs.append("code_fence")
+    ok, value, extra = _scan_json(body)
+    if not ok and body is not text:
+        ok, value, extra = _scan_json(text)
+    if not ok:
+        normalized = body.translate(_SMART_QUOTES)
+        if normalized != body:
+            ok, value, extra = _scan_json(normalized)
+            extra = ["smart_quotes"] + extra
+    repairs = repairs + extra if ok else ["failed"]
+    with _JSON_REPAIRS_LOCK:
+        for r in repairs:
+            _JSON_REPAIRS[r] = _JSON_REPAIRS.get(r, 0) + 1
+    for r in repairs:
+        metrics.inc("mystrat_json_repairs_total", repair=r)
+    return (value if ok else {}), repairs
+
+def _extract_json(text: str) -> Any:
+    """Try to parse JSON (object or array) from the model output.
+    Accepts raw JSON, fenced blocks or JSON inside prose; falls back to empty dict.
+    """
+    return _extract_json_repaired(text)[0]
+
+def json_repair_stats() -> Dict[str, int]:
+    """How often each `_extract_json` repair was needed in this process."""
+    with _JSON_REPAIRS_LOCK:
+        return dict(_JSON_REPAIRS)
+
+class IncrementalJSONParser:
+    """Incremental reader for streamed `{"key": [..], ...}` model output.
+
+    `feed()` text chunks as they arrive; each array element of a top-level key is
+    parsed as soon as its closing `,` or `]` is seen and appended to `lists`.
+    Anything before the first `{` (prose, code fences) is skipped; scalar or
+    object values at the top level are ignored. The full text is still parsed by
+    `_extract_json` once the stream ends, so this only drives progressive display.
+    """
+
+    def __init__(self) -> None:
+        self.lists: Dict[str, List[Any]] = {}
+        self.done = False
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._expect_key = False
+        self._key_chars: Optional[List[str]] = None
+        self._key = ""
+        self._array_key: Optional[str] = None
+        self._elem: List[str] = []
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; return True if at least one new element completed."""
+        grew = False
+        for ch in chunk:
+            if self.done:
+                break
+            capturing = self._array_key is not None
+            if self._in_str:
+                if capturing:
+                    self._elem.append(ch)
+                if self._esc:
+                    self._esc = False
+                    if self._key_chars is not None:
+                        self._key_chars.append(ch)
+                elif ch == "\\":
+                    self._esc = True
+                    if self._key_chars is not None:
+                        self._key_chars.append(ch)
+                elif ch == '"':
+                    self._in_str = False
+                    if self._key_chars is not None:
+                        raw = "".join(self._key_chars)
+                        try:
+                            self._key = json.loads(f'"{raw}"')
+                        except (ValueError, RecursionError):
+                            self._key = raw
+                        self._key_chars = None
+                elif self._key_chars is not None:
+                    self._key_chars.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_str = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_chars = []
+                elif capturing:
+                    self._elem.append(ch)
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if self._depth == 1:
+                if ch == ":":
+                    self._expect_key = False
+                elif ch == ",":
+                    self._expect_key = True
+                elif ch == "[":
+                    self._depth = 2
+                    self._array_key = self._key
+                    self.lists.setdefault(self._key, [])
+                    self._elem = []
+                elif ch == "{":
+                    self._depth = 2
+                elif ch == "}":
+                    self._depth = 0
+                    self.done = True
+                continue
+
+            # depth >= 2
+            if capturing and self._depth == 2 and ch in ",]":
+                grew = self._flush() or grew
+                if ch == "]":
+                    self._depth = 1
+                    self._array_key = None
+                continue
+            if ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+            if capturing:
+                self._elem.append(ch)
+        return grew
+
+    def _flush(self) -> bool:
+        text = "".join(self._elem).strip()
+        self._elem = []
+        if not text or self._array_key is None:
+            return False
         try:
-            return json.loads(m.group(0))
-        except Exception:
-            pass
-    return {}
+            self.lists[self._array_key].append(json.loads(text))
+        except (ValueError, RecursionError):
+            return False
+        return True
+
+    def snapshot(self, keys: Sequence[str]) -> Dict[str, List[Any]]:
+        """Copy of the elements seen so far for `keys` (missing keys map to [])."""
+        return {k: list(self.lists.get(k, [])) for k in keys}
 
 # Clamp helper to top-N items per list to keep outputs tidy
 
@@ -149,17 +655,112 @@ Return JSON: {{"peers": ["{peers_csv}"], "table": [{{"capability": str, "{compan
 Keep table length = {len(caps)}.
 """.strip()
 
-def _recs_prompt(company: str, product: str, results: Dict[str, Any]) -> str:
-    context = json.dumps(results, ensure_ascii=False)
+# default size of the analysis context in the recommendations prompt, in estimated tokens
+RECS_CONTEXT_TOKENS = int(os.getenv("MYSTRAT_RECS_CONTEXT_TOKENS", "1500"))
+
+def _compact_item(item: Any, max_chars: int) -> str:
+    if isinstance(item, dict):
+        # benchmark/fit rows: "Channel: ACME=High, Rival A=Medium"
+        label = item.get("capability")
+        rest = ", ".join(f"{k}={v}" for k, v in item.items() if k != "capability")
+        item = f"{label}: {rest}" if label is not None else rest
+    text = " ".join(str(item).split())
+    return text if len(text) <= max_chars else text[: max_chars - 1].rstrip() + "…"
+
+def _compact_results(results: Dict[str, Any], budget_tokens: int = RECS_CONTEXT_TOKENS) -> str:
+    """Minified JSON of `results` for the recommendations prompt, within ~`budget_tokens`.
+
+    Rows become one-line strings and empty sections are dropped. Every list keeps
+    its first items (models list the most important first), as many as fit the
+    budget; if one each is still too much, items are clipped shorter.
+    """
+    def _render(per_list: int, max_chars: int) -> str:
+        out: Dict[str, Any] = {}
+        for name, section in results.items():
+            if isinstance(section, dict):
+                body = {
+                    k: [_compact_item(i, max_chars) for i in v[:per_list]] if isinstance(v, list) else v
+                    for k, v in section.items() if v
+                }
+                body.pop("peers", None)  # repeated in every benchmark row
+                if body:
+                    out[name] = body
+            elif isinstance(section, list) and section:
+                out[name] = [_compact_item(i, max_chars) for i in section[:per_list]]
+            elif section:
+                out[name] = section
+        return json.dumps(out, ensure_ascii=False, separators=(",", ":"))
+
+    lists = [v for section in results.values() if isinstance(section, dict) for v in section.values() if isinstance(v, list)]
+    lists += [v for v in results.values() if isinstance(v, list)]
+    max_chars = 200
+    # largest per-list count within budget, by bisection (the size grows with it): O(log n) renders
+    lo, hi = 1, max((len(v) for v in lists), default=1)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(_render(mid, max_chars)) <= budget_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    text = _render(lo, max_chars)
+    while estimate_tokens(text) > budget_tokens and max_chars > 40:
+        max_chars //= 2
+        text = _render(lo, max_chars)
+    return text
+
+def _recs_prompt(company: str, product: str, results: Dict[str, Any], budget_tokens: int = RECS_CONTEXT_TOKENS) -> str:
+    context = _compact_results(results, budget_tokens)
     return f"""
 Based on this analysis JSON: {context}
 Return JSON array of 5 recommendation objects with keys: title, impact (1-5), effort (1-5), rationale.
 Keep titles crisp; impact×effort should reflect SWOT threats/opportunities and Ansoff moves.
 """.strip()
 
+def _combined_prompt(
+    company: str,
+    product: str,
+    notes: Optional[str],
+    geo: Optional[str],
+    sections: List[str],
+    peers: List[str],
+    caps: List[str],
+    top_k: int,
+) -> str:
+    """One request covering every selected framework (and optionally recommendations)."""
+    specs = {
+        "SWOT": '"SWOT": {"S":[],"W":[],"O":[],"T":[]} - each an array of short bullets',
+        "Ansoff": '"Ansoff": {"market_penetration":[],"market_development":[],"product_development":[],"diversification":[]} - each an array of short initiatives',
+        "Benchmark": (
+            f'"Benchmark": {{"table": [{{"capability": str, "{company}": str, '
+            + ", ".join(f'"{p}": str' for p in peers)
+            + f"}} ...]}} - rate {company} vs peers {', '.join(peers)} on: {', '.join(caps)}. "
+            f"Ratings must be one of: Low, Medium, High, Best-in-class. Table length = {len(caps)}"
+        ),
+        "recs": f'"recs": array of {top_k} objects with keys title, impact (1-5), effort (1-5), rationale - reflect the SWOT threats/opportunities and Ansoff moves above',
+    }
+    lines = "\n".join(f"- {specs[s]}" for s in sections)
+    return f"""
+Company: {company}
+Product: {product}
+Geography: {geo or "unspecified"}
+Notes: {notes or ""}
+
+Return one JSON object with exactly these top-level keys: {", ".join(sections)}.
+{lines}
+""".strip()
+
 # ---------------------- Fallback (offline) heuristics ----------------------
 
+# set when a result is answered with canned fallback content in this thread / task;
+# the prefetcher checks it so a failed prefetch is never handed out as the analysis
+_FELL_BACK: ContextVar[bool] = ContextVar("mystrat_fell_back", default=False)
+
+def _note_fallback(result: str) -> None:
+    _FELL_BACK.set(True)
+    metrics.inc("mystrat_fallbacks_total", result=result)
+
 def _fallback_swot() -> Dict[str, List[str]]:
+    _note_fallback("SWOT")
     return {
         "S": [
             "Clear value proposition",
@@ -185,6 +786,7 @@ def _fallback_swot() -> Dict[str, List[str]]:
     }
 
 def _fallback_ansoff() -> Dict[str, List[str]]:
+    _note_fallback("Ansoff")
     return {
         "market_penetration": ["Bundle add-ons for existing customers", "Loyalty pricing to reduce churn"],
         "market_development": ["Enter 1–2 adjacent regions", "Activate reseller partners"],
@@ -193,6 +795,7 @@ def _fallback_ansoff() -> Dict[str, List[str]]:
     }
 
 def _fallback_benchmark(company: str, peers: List[str], caps: List[str]) -> Dict[str, Any]:
+    _note_fallback("Benchmark")
     table = []
     scale = ["Low", "Medium", "High"]
     for i, cap in enumerate(caps):
@@ -202,119 +805,295 @@ def _fallback_benchmark(company: str, peers: List[str], caps: List[str]) -> Dict
         table.append(row)
     return {"peers": peers, "table": table}
 
+# ---------------------- Output parsing ----------------------
+# Shared by the sync and async generator paths. Each returns None when the model
+# output is unusable so the caller can fall back.
+
+def _parse_swot(out: Any) -> Optional[Dict[str, List[str]]]:
+    if not isinstance(out, dict):
+        return None
+    S = _coerce_list(out.get("S"))
+    W = _coerce_list(out.get("W"))
+    O = _coerce_list(out.get("O"))
+    T = _coerce_list(out.get("T"))
+    if any([S, W, O, T]):
+        return {"S": _topn(S), "W": _topn(W), "O": _topn(O), "T": _topn(T)}
+    return None
+
+def _parse_ansoff(out: Any) -> Optional[Dict[str, List[str]]]:
+    if not isinstance(out, dict):
+        return None
+    mp = _coerce_list(out.get("market_penetration"))
+    md = _coerce_list(out.get("market_development"))
+    pd = _coerce_list(out.get("product_development"))
+    dv = _coerce_list(out.get("diversification"))
+    if any([mp, md, pd, dv]):
+        return {
+            "market_penetration": _topn(mp),
+            "market_development": _topn(md),
+            "product_development": _topn(pd),
+            "diversification": _topn(dv),
+        }
+    return None
+
+def _parse_benchmark(out: Any, company: str, peers: List[str], caps: List[str]) -> Optional[Dict[str, Any]]:
+    if not isinstance(out, dict):
+        return None
+    table = out.get("table")
+    if isinstance(table, list) and table:
+        # keep only declared columns
+        cleaned = []
+        for row in table:
+            if not isinstance(row, dict):
+                continue
+            base = {"capability": str(row.get("capability", "")).strip()}
+            if not base["capability"]:
+                continue
+            base[company] = str(row.get(company, "")).strip() or "Medium"
+            for p in peers:
+                base[p] = str(row.get(p, "")).strip() or "Medium"
+            cleaned.append(base)
+        return {"peers": peers, "table": cleaned[: len(caps)]}
+    return None
+
+def _parse_recs(out: Any, top_k: int) -> Optional[List[Dict[str, Any]]]:
+    if isinstance(out, list) and out:
+        cleaned = []
+        for item in out[: top_k]:
+            if not isinstance(item, dict):
+                continue
+            title = str(item.get("title", "")).strip()
+            if not title:
+                continue
+            impact = int(item.get("impact", 3))
+            effort = int(item.get("effort", 2))
+            rationale = str(item.get("rationale", "")).strip()
+            cleaned.append({"title": title, "impact": max(1, min(5, impact)), "effort": max(1, min(5, effort)), "rationale": rationale})
+        if cleaned:
+            return cleaned
+    return None
+
+def _heuristic_recs(results: Dict[str, Any], top_k: int) -> List[Dict[str, Any]]:
+    _note_fallback("recs")
+    # Heuristic scaffold using SWOT + Ansoff if no LLM
+    def _score(title: str) -> Dict[str, int]:
+        # naive scoring based on keywords
+        t = title.lower()
+        impact = 5 if any(k in t for k in ["bundle", "platform", "ai", "oem", "security"]) else 4
+        effort = 3 if any(k in t for k in ["managed", "new region"]) else 2
+        return {"impact": impact, "effort": effort}
+
+    swot = results.get("SWOT", {})
+    ansoff = results.get("Ansoff", {})
+    seeds = []
+    seeds += ansoff.get("market_penetration", [])
+    seeds += ansoff.get("product_development", [])
+    seeds += swot.get("O", [])
+    seeds = [s for s in seeds if s]
+    if not seeds:
+        seeds = [
+            "OEM bundle program",
+            "Managed calibration add-on",
+            "Security proof pack",
+            "SKU simplification",
+            "Launch design partner pilot",
+        ]
+    recs = []
+    for s in seeds[: top_k]:
+        sc = _score(s)
+        recs.append({"title": s, "impact": sc["impact"], "effort": sc["effort"], "rationale": "Derived from analysis."})
+    return recs
+
 # ---------------------- Core Generator ----------------------
 
 @dataclass
 class StrategyGenerator:
     provider: Optional[LLMProvider] = None
+    # >1 runs the selected frameworks' LLM calls in parallel threads
+    max_workers: int = 1
+    # True asks for all selected frameworks (and recs, via generate_analysis) in one request
+    combined: bool = False
+    # completion cap per framework call (the API stops and reports finish_reason=length)
+    max_tokens: int = 1200
+    # size budget for the analysis context in the recommendations prompt
+    recs_context_tokens: int = RECS_CONTEXT_TOKENS
 
     # ---- Public API ----
     def generate_swot(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Dict[str, List[str]]:
         if self.provider:
-            out = _extract_json(
-                self.provider.complete(_GEN_SYS, _swot_prompt(company, product, notes, geo))
-            )
-            S = _coerce_list(out.get("S"))
-            W = _coerce_list(out.get("W"))
-            O = _coerce_list(out.get("O"))
-            T = _coerce_list(out.get("T"))
-            if any([S, W, O, T]):
-                return {"S": _topn(S), "W": _topn(W), "O": _topn(O), "T": _topn(T)}
+            parsed = _parse_swot(_extract_json(
+                self._complete(_swot_prompt(company, product, notes, geo), "SWOT")
+            ))
+            if parsed:
+                return parsed
         # fallback
         return _fallback_swot()
 
     def generate_ansoff(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Dict[str, List[str]]:
         if self.provider:
-            out = _extract_json(
-                self.provider.complete(_GEN_SYS, _ansoff_prompt(company, product, notes, geo))
-            )
-            mp = _coerce_list(out.get("market_penetration"))
-            md = _coerce_list(out.get("market_development"))
-            pd = _coerce_list(out.get("product_development"))
-            dv = _coerce_list(out.get("diversification"))
-            if any([mp, md, pd, dv]):
-                return {
-                    "market_penetration": _topn(mp),
-                    "market_development": _topn(md),
-                    "product_development": _topn(pd),
-                    "diversification": _topn(dv),
-                }
+            parsed = _parse_ansoff(_extract_json(
+                self._complete(_ansoff_prompt(company, product, notes, geo), "Ansoff")
+            ))
+            if parsed:
+                return parsed
         return _fallback_ansoff()
 
     def generate_benchmark(self, company: str, product: str, *, peers: Optional[List[str]] = None, caps: Optional[List[str]] = None) -> Dict[str, Any]:
         peers = peers or ["PeerA", "PeerB"]
         caps = caps or _DEF_BENCH_CAPS
         if self.provider:
-            out = _extract_json(
-                self.provider.complete(_GEN_SYS, _benchmark_prompt(company, product, peers, caps))
-            )
-            table = out.get("table")
-            if isinstance(table, list) and table:
-                # keep only declared columns
-                cleaned = []
-                for row in table:
-                    if not isinstance(row, dict):
-                        continue
-                    base = {"capability": str(row.get("capability", "")).strip()}
-                    if not base["capability"]:
-                        continue
-                    base[company] = str(row.get(company, "")).strip() or "Medium"
-                    for p in peers:
-                        base[p] = str(row.get(p, "")).strip() or "Medium"
-                    cleaned.append(base)
-                return {"peers": peers, "table": cleaned[: len(caps)]}
+            parsed = _parse_benchmark(_extract_json(
+                self._complete(_benchmark_prompt(company, product, peers, caps), "Benchmark")
+            ), company, peers, caps)
+            if parsed:
+                return parsed
         return _fallback_benchmark(company, peers, caps)
 
     def generate_recommendations(self, results: Dict[str, Any], *, top_k: int = 5, constraints: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        # Heuristic scaffold using SWOT + Ansoff if no LLM
-        def _score(title: str) -> Dict[str, int]:
-            # naive scoring based on keywords
-            t = title.lower()
-            impact = 5 if any(k in t for k in ["bundle", "platform", "ai", "oem", "security"]) else 4
-            effort = 3 if any(k in t for k in ["managed", "new region"]) else 2
-            return {"impact": impact, "effort": effort}
+        if self.provider:
+            try:
+                parsed = _parse_recs(_extract_json(self._complete(_recs_prompt("", "", results, self.recs_context_tokens), "recs")), top_k)
+                if parsed:
+                    return parsed
+            except Exception:
+                pass
+        # Fallback: derive from inputs
+        return _heuristic_recs(results, top_k)
+
+    # ---- Streaming API (progressive display) ----
+    def stream_swot(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Iterator[Dict[str, List[str]]]:
+        """Yield partial SWOT dicts as bullets stream in; the last item is the final
+        result, identical to `generate_swot`.
+        """
+        return self._stream_lists("SWOT", _swot_prompt(company, product, notes, geo), ("S", "W", "O", "T"), _parse_swot, _fallback_swot)
+
+    def stream_ansoff(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Iterator[Dict[str, List[str]]]:
+        """Streaming counterpart of `generate_ansoff` (see `stream_swot`)."""
+        keys = ("market_penetration", "market_development", "product_development", "diversification")
+        return self._stream_lists("Ansoff", _ansoff_prompt(company, product, notes, geo), keys, _parse_ansoff, _fallback_ansoff)
+
+    def stream_selected_frameworks(
+        self,
+        *,
+        company: str,
+        product: str,
+        frameworks: List[str],
+        notes: Optional[str] = None,
+        geo: Optional[str] = None,
+        peers: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Any, bool]]:
+        """Yield (result key, value, done) events while the selected frameworks generate.
 
+        SWOT and Ansoff emit partial values as list items complete; every framework
+        ends with exactly one `done=True` event whose value matches what
+        `generate_selected_frameworks` would return (including fallbacks). Frameworks
+        run on up to `max_workers` threads; events arrive in completion order.
+        """
+        fwset = set([f.strip() for f in frameworks])
+        peers = peers or ["PeerA", "PeerB"]
+        tasks = self._framework_tasks(company, product, fwset, notes=notes, geo=geo, peers=peers)
+        events: "queue.Queue[Tuple[str, Any, bool]]" = queue.Queue()
+
+        parent = metrics.current_span()
+
+        def _run(key: str, method: str, kwargs: Dict[str, Any], fallback: Callable[[], Any]) -> None:
+            streamer = getattr(self, "stream_" + method[len("generate_"):], None)
+            with metrics.attach(parent):
+                try:
+                    if streamer is None:
+                        events.put((key, getattr(self, method)(company, product, **kwargs), True))
+                        return
+                    last = None
+                    for last in streamer(company, product, **kwargs):
+                        events.put((key, last, False))
+                    events.put((key, last, True))
+                except Exception:
+                    metrics.inc("mystrat_llm_errors_total")
+                    events.put((key, fallback(), True))
+
+        workers = self.max_workers if max_workers is None else max_workers
+        workers = max(1, min(workers, len(tasks) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="strategy-stream") as pool:
+            for task in tasks:
+                pool.submit(_run, *task)
+            remaining = len(tasks)
+            while remaining:
+                event = events.get()
+                if event[2]:
+                    remaining -= 1
+                yield event
+        if "Fit Matrix" in fwset:
+            yield "Fit", _fit_placeholder(), True
+
+    # ---- Async API (same results, awaitable provider calls) ----
+    async def agenerate_swot(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Dict[str, List[str]]:
+        if self.provider:
+            parsed = _parse_swot(_extract_json(
+                await self._acomplete(_swot_prompt(company, product, notes, geo), "SWOT")
+            ))
+            if parsed:
+                return parsed
+        return _fallback_swot()
+
+    async def agenerate_ansoff(self, company: str, product: str, *, notes: Optional[str] = None, geo: Optional[str] = None) -> Dict[str, List[str]]:
+        if self.provider:
+            parsed = _parse_ansoff(_extract_json(
+                await self._acomplete(_ansoff_prompt(company, product, notes, geo), "Ansoff")
+            ))
+            if parsed:
+                return parsed
+        return _fallback_ansoff()
+
+    async def agenerate_benchmark(self, company: str, product: str, *, peers: Optional[List[str]] = None, caps: Optional[List[str]] = None) -> Dict[str, Any]:
+        peers = peers or ["PeerA", "PeerB"]
+        caps = caps or _DEF_BENCH_CAPS
+        if self.provider:
+            parsed = _parse_benchmark(_extract_json(
+                await self._acomplete(_benchmark_prompt(company, product, peers, caps), "Benchmark")
+            ), company, peers, caps)
+            if parsed:
+                return parsed
+        return _fallback_benchmark(company, peers, caps)
+
+    async def agenerate_recommendations(self, results: Dict[str, Any], *, top_k: int = 5, constraints: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         if self.provider:
             try:
-                out = _extract_json(self.provider.complete(_GEN_SYS, _recs_prompt("", "", results)))
-                if isinstance(out, list) and out:
-                    cleaned = []
-                    for item in out[: top_k]:
-                        if not isinstance(item, dict):
-                            continue
-                        title = str(item.get("title", "")).strip()
-                        if not title:
-                            continue
-                        impact = int(item.get("impact", 3))
-                        effort = int(item.get("effort", 2))
-                        rationale = str(item.get("rationale", "")).strip()
-                        cleaned.append({"title": title, "impact": max(1, min(5, impact)), "effort": max(1, min(5, effort)), "rationale": rationale})
-                    if cleaned:
-                        return cleaned
+                parsed = _parse_recs(_extract_json(await self._acomplete(_recs_prompt("", "", results, self.recs_context_tokens), "recs")), top_k)
+                if parsed:
+                    return parsed
             except Exception:
                 pass
+        return _heuristic_recs(results, top_k)
 
-        # Fallback: derive from inputs
-        swot = results.get("SWOT", {})
-        ansoff = results.get("Ansoff", {})
-        seeds = []
-        seeds += ansoff.get("market_penetration", [])
-        seeds += ansoff.get("product_development", [])
-        seeds += swot.get("O", [])
-        seeds = [s for s in seeds if s]
-        if not seeds:
-            seeds = [
-                "OEM bundle program",
-                "Managed calibration add-on",
-                "Security proof pack",
-                "SKU simplification",
-                "Launch design partner pilot",
-            ]
-        recs = []
-        for s in seeds[: top_k]:
-            sc = _score(s)
-            recs.append({"title": s, "impact": sc["impact"], "effort": sc["effort"], "rationale": "Derived from analysis."})
-        return recs
+    async def agenerate_selected_frameworks(
+        self,
+        *,
+        company: str,
+        product: str,
+        frameworks: List[str],
+        notes: Optional[str] = None,
+        geo: Optional[str] = None,
+        peers: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Async `generate_selected_frameworks`: all framework calls are awaited
+        concurrently. Gather many of these to run many analyses on one loop.
+        """
+        fwset = set([f.strip() for f in frameworks])
+        peers = peers or ["PeerA", "PeerB"]
+        tasks = self._framework_tasks(company, product, fwset, notes=notes, geo=geo, peers=peers)
+
+        async def _run(method: str, kwargs: Dict[str, Any], fallback: Callable[[], Any]) -> Any:
+            try:
+                return await getattr(self, "a" + method)(company, product, **kwargs)
+            except Exception:
+                return fallback()
+
+        values = await asyncio.gather(*(_run(m, kw, fb) for _, m, kw, fb in tasks))
+        out: Dict[str, Any] = {key: value for (key, _, _, _), value in zip(tasks, values)}
+        if "Fit Matrix" in fwset:
+            out["Fit"] = _fit_placeholder()
+        return out
 
     def generate_selected_frameworks(
         self,
@@ -325,23 +1104,387 @@ class StrategyGenerator:
         notes: Optional[str] = None,
         geo: Optional[str] = None,
         peers: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
     ) -> Dict[str, Any]:
-        out: Dict[str, Any] = {}
+        """Run the selected frameworks and return results keyed by framework.
+
+        With `max_workers` > 1 (argument or field) the independent LLM calls are
+        issued in parallel. Result order is always SWOT, Ansoff, Benchmark, Fit,
+        and a framework whose call raises gets its `_fallback_*` content.
+        """
+        fwset = set([f.strip() for f in frameworks])
+        peers = peers or ["PeerA", "PeerB"]
+        tasks = self._framework_tasks(company, product, fwset, notes=notes, geo=geo, peers=peers)
+        if self.combined and self.provider and len(tasks) > 1:
+            out, _ = self._generate_combined(company, product, tasks, notes=notes, geo=geo, peers=peers, max_workers=max_workers)
+        else:
+            out = self._run_tasks(company, product, tasks, max_workers)
+        if "Fit Matrix" in fwset:
+            out["Fit"] = _fit_placeholder()
+        return out
+
+    def generate_analysis(
+        self,
+        *,
+        company: str,
+        product: str,
+        frameworks: List[str],
+        notes: Optional[str] = None,
+        geo: Optional[str] = None,
+        peers: Optional[List[str]] = None,
+        top_k: int = 5,
+        max_workers: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Frameworks plus recommendations as (results, recs).
+
+        In `combined` mode this is a single chat completion; sections that come back
+        missing or invalid are re-requested individually (and fall back from there).
+        Otherwise it is `generate_selected_frameworks` followed by
+        `generate_recommendations`.
+        """
         fwset = set([f.strip() for f in frameworks])
+        peers = peers or ["PeerA", "PeerB"]
+        if not (self.combined and self.provider):
+            results = self.generate_selected_frameworks(
+                company=company, product=product, frameworks=frameworks,
+                notes=notes, geo=geo, peers=peers, max_workers=max_workers,
+            )
+            return results, self.generate_recommendations(results, top_k=top_k)
+        tasks = self._framework_tasks(company, product, fwset, notes=notes, geo=geo, peers=peers)
+        results, recs = self._generate_combined(
+            company, product, tasks, notes=notes, geo=geo, peers=peers, max_workers=max_workers, top_k=top_k,
+        )
+        if "Fit Matrix" in fwset:
+            results["Fit"] = _fit_placeholder()
+        if recs is None:
+            recs = self.generate_recommendations(results, top_k=top_k)
+        return results, recs
+
+    # ---- Internals ----
+    def _complete(self, prompt: str, section: str, *, max_tokens: Optional[int] = None) -> str:
+        with metrics.span("llm.complete", section=section) as sp:
+            text = self.provider.complete(_GEN_SYS, prompt, max_tokens=max_tokens or self.max_tokens)
+            sp.set(prompt_chars=len(prompt), response_chars=len(text))
+            return text
+
+    async def _acomplete(self, prompt: str, section: str) -> str:
+        with metrics.span("llm.complete", section=section) as sp:
+            text = await self.provider.acomplete(_GEN_SYS, prompt, max_tokens=self.max_tokens)
+            sp.set(prompt_chars=len(prompt), response_chars=len(text))
+            return text
+
+    def _run_tasks(
+        self,
+        company: str,
+        product: str,
+        tasks: List[Tuple[str, str, Dict[str, Any], Callable[[], Any]]],
+        max_workers: Optional[int],
+    ) -> Dict[str, Any]:
+        workers = self.max_workers if max_workers is None else max_workers
+        workers = max(1, min(workers, len(tasks) or 1))
+        parent = metrics.current_span()
+        calls = [
+            (lambda m=m, kw=kw: getattr(self, m)(company, product, **kw), fb, parent)
+            for _, m, kw, fb in tasks
+        ]
+        if workers == 1:
+            values = [_run_with_fallback(*c) for c in calls]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="strategy-gen") as pool:
+                values = list(pool.map(lambda c: _run_with_fallback(*c), calls))
+        return {key: value for (key, _, _, _), value in zip(tasks, values)}
+
+    def _generate_combined(
+        self,
+        company: str,
+        product: str,
+        tasks: List[Tuple[str, str, Dict[str, Any], Callable[[], Any]]],
+        *,
+        notes: Optional[str],
+        geo: Optional[str],
+        peers: List[str],
+        max_workers: Optional[int],
+        top_k: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+        """One request for every task's section (plus "recs" when `top_k` is given).
+        Returns (results, recs); recs is None when it was not requested or is unusable.
+        """
+        caps = _DEF_BENCH_CAPS
+        sections = [key for key, _, _, _ in tasks] + (["recs"] if top_k else [])
+        parsers: Dict[str, Callable[[Any], Any]] = {
+            "SWOT": _parse_swot,
+            "Ansoff": _parse_ansoff,
+            "Benchmark": lambda out: _parse_benchmark(out, company, peers, caps),
+        }
+        try:
+            doc = _extract_json(self._complete(
+                _combined_prompt(company, product, notes, geo, sections, peers, caps, top_k or 0),
+                "combined",
+                max_tokens=self.max_tokens * len(sections),
+            ))
+        except Exception:
+            doc = {}
+        if not isinstance(doc, dict):
+            doc = {}
+
+        results: Dict[str, Any] = {}
+        missing = []
+        for task in tasks:
+            parsed = parsers[task[0]](doc.get(task[0]))
+            if parsed:
+                results[task[0]] = parsed
+            else:
+                missing.append(task)
+        if missing:
+            # only the broken sections pay for another round trip
+            results.update(self._run_tasks(company, product, missing, max_workers))
+        results = {key: results[key] for key, _, _, _ in tasks}
+
+        recs = None
+        if top_k:
+            try:
+                recs = _parse_recs(doc.get("recs"), top_k)
+            except Exception:
+                recs = None
+        return results, recs
+
+    def _stream_lists(
+        self,
+        section: str,
+        prompt: str,
+        keys: Sequence[str],
+        parse: Callable[[Any], Optional[Dict[str, List[str]]]],
+        fallback: Callable[[], Dict[str, List[str]]],
+    ) -> Iterator[Dict[str, List[str]]]:
+        if self.provider:
+            parser = IncrementalJSONParser()
+            parts: List[str] = []
+            with metrics.span("llm.stream", section=section) as sp:
+                t0 = time.perf_counter()
+                for chunk in self.provider.stream(_GEN_SYS, prompt, max_tokens=self.max_tokens):
+                    if not parts:
+                        sp.set(first_chunk_ms=round((time.perf_counter() - t0) * 1000, 1))
+                    parts.append(chunk)
+                    if parser.feed(chunk):
+                        yield {k: _topn(_coerce_list(v)) for k, v in parser.snapshot(keys).items()}
+            parsed = parse(_extract_json("".join(parts)))
+            if parsed:
+                yield parsed
+                return
+        yield fallback()
+
+    def _framework_tasks(
+        self,
+        company: str,
+        product: str,
+        fwset: set,
+        *,
+        notes: Optional[str],
+        geo: Optional[str],
+        peers: List[str],
+    ) -> List[Tuple[str, str, Dict[str, Any], Callable[[], Any]]]:
+        """(result key, generate method name, kwargs, fallback) for each LLM-backed
+        framework, in output order. The async path calls the `a`-prefixed method.
+        """
+        tasks: List[Tuple[str, str, Dict[str, Any], Callable[[], Any]]] = []
         if "SWOT" in fwset:
-            out["SWOT"] = self.generate_swot(company, product, notes=notes, geo=geo)
+            tasks.append(("SWOT", "generate_swot", {"notes": notes, "geo": geo}, _fallback_swot))
         if "Ansoff" in fwset:
-            out["Ansoff"] = self.generate_ansoff(company, product, notes=notes, geo=geo)
+            tasks.append(("Ansoff", "generate_ansoff", {"notes": notes, "geo": geo}, _fallback_ansoff))
         if "Benchmark" in fwset:
-            out["Benchmark"] = self.generate_benchmark(company, product, peers=peers)
-        if "Fit Matrix" in fwset:
-            # simple placeholder matrix
-            out["Fit"] = {"matrix": [
-                {"capability": "Core platform", "fit": "High"},
-                {"capability": "Go-to-market", "fit": "Medium"},
-                {"capability": "Operations", "fit": "Medium"},
-            ]}
-        return out
+            tasks.append((
+                "Benchmark",
+                "generate_benchmark",
+                {"peers": peers},
+                lambda: _fallback_benchmark(company, peers, _DEF_BENCH_CAPS),
+            ))
+        return tasks
+
+
+def _fit_placeholder() -> Dict[str, Any]:
+    # simple placeholder matrix
+    return {"matrix": [
+        {"capability": "Core platform", "fit": "High"},
+        {"capability": "Go-to-market", "fit": "Medium"},
+        {"capability": "Operations", "fit": "Medium"},
+    ]}
+
+def _run_with_fallback(call: Callable[[], Any], fallback: Callable[[], Any], parent: Optional[metrics.Span] = None) -> Any:
+    """`call()`, or `fallback()` if it raises; `parent` links spans opened on a worker thread."""
+    with metrics.attach(parent):
+        try:
+            return call()
+        except Exception:
+            metrics.inc("mystrat_llm_errors_total")
+            return fallback()
+
+def _prefetch_job(call: Callable[[], Any], parent: Optional[metrics.Span] = None) -> Optional[Any]:
+    """`call()` on a prefetch thread; None if it raised or fell back to canned content."""
+    with metrics.attach(parent):
+        _FELL_BACK.set(False)
+        try:
+            value = call()
+        except Exception:
+            metrics.inc("mystrat_llm_errors_total")
+            return None
+        return None if _FELL_BACK.get() else value
+
+# ---------------------- Provenance (incremental regeneration) ----------------------
+
+# result key -> the generation inputs its prompt is built from; "results" is every
+# framework result (including saved user edits), which the recommendations prompt embeds
+RESULT_DEPENDS: Dict[str, Tuple[str, ...]] = {
+    "SWOT": ("company", "product", "geo", "notes"),
+    "Ansoff": ("company", "product", "geo", "notes"),
+    "Benchmark": ("company", "product", "peers"),
+    "Fit": (),
+    "recs": ("results",),
+}
+
+# framework names as selected in the UI -> result keys
+FRAMEWORK_KEYS = {"SWOT": "SWOT", "Ansoff": "Ansoff", "Benchmark": "Benchmark", "Fit Matrix": "Fit"}
+
+
+def provenance(key: str, inputs: Mapping[str, Any]) -> str:
+    """Fingerprint of the inputs result `key` depends on. Empty notes/geo count as unset."""
+    deps = {name: inputs.get(name) or None for name in RESULT_DEPENDS[key]}
+    blob = json.dumps(deps, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def stale_frameworks(
+    frameworks: Sequence[str], inputs: Mapping[str, Any], results: Mapping[str, Any], recorded: Mapping[str, str]
+) -> List[str]:
+    """The selected frameworks whose result is missing or was generated from different inputs.
+
+    `recorded` maps result keys to the provenance stored when they were generated;
+    results without a record (e.g. the empty placeholders) are always stale.
+    """
+    stale = []
+    for name in frameworks:
+        key = FRAMEWORK_KEYS.get(name.strip(), name.strip())
+        if key not in results or recorded.get(key) != provenance(key, inputs):
+            stale.append(name)
+    return stale
+
+class FrameworkPrefetcher:
+    """Speculative background generation of frameworks the user has not asked for yet.
+
+    Jobs are keyed by (analysis id, result key) and tagged with the provenance of
+    the inputs they started from; `claim()` / `take()` only hand over a job whose
+    inputs still match, so a prefetch can never leak stale content, and a job
+    that failed or fell back to canned content yields None. Cancelling drops the
+    job: a call that has not started is never made, one already in flight finishes
+    and its result is discarded.
+    """
+
+    def __init__(self, max_workers: int = 4, max_jobs: int = 256) -> None:
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[Tuple[str, str], Tuple[str, Future]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.cancelled = 0
+
+    def start(self, gen: "StrategyGenerator", analysis_id: str, frameworks: Sequence[str], inputs: Mapping[str, Any]) -> List[str]:
+        """Start generating `frameworks` from `inputs` (see RESULT_DEPENDS); returns the result keys started."""
+        company, product = inputs["company"], inputs["product"]
+        peers = list(inputs.get("peers") or ["PeerA", "PeerB"])
+        tasks = gen._framework_tasks(
+            company, product, {f.strip() for f in frameworks},
+            notes=inputs.get("notes"), geo=inputs.get("geo") or None, peers=peers,
+        )
+        started = []
+        parent = metrics.current_span()  # the caller's trace continues on the pool threads
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="strategy-prefetch")
+            for key, method, kwargs, _fallback in tasks:
+                fingerprint = provenance(key, inputs)
+                job = self._jobs.get((analysis_id, key))
+                if job is not None and job[0] == fingerprint:
+                    continue
+                if job is not None:
+                    self._cancel(job)
+                call = lambda m=method, kw=kwargs: getattr(gen, m)(company, product, **kw)
+                self._jobs[(analysis_id, key)] = (fingerprint, self._pool.submit(_prefetch_job, call, parent))
+                self._jobs.move_to_end((analysis_id, key))
+                started.append(key)
+            while len(self._jobs) > self.max_jobs:  # abandoned sessions
+                self._cancel(self._jobs.popitem(last=False)[1])
+        return started
+
+    def cancel(self, analysis_id: str, *, keep: Optional[Sequence[str]] = None, inputs: Optional[Mapping[str, Any]] = None) -> List[str]:
+        """Drop this analysis' jobs, except result keys in `keep` whose inputs still match `inputs`."""
+        dropped = []
+        with self._lock:
+            for (aid, key), job in list(self._jobs.items()):
+                if aid != analysis_id:
+                    continue
+                wanted = (keep is None or key in keep) and (inputs is None or job[0] == provenance(key, inputs))
+                if wanted and (keep is not None or inputs is not None):
+                    continue
+                del self._jobs[(aid, key)]
+                self._cancel(job)
+                dropped.append(key)
+        return dropped
+
+    def claim(self, analysis_id: str, key: str, inputs: Mapping[str, Any]) -> Optional[Future]:
+        """Hand over the job for `key` if it was started from `inputs`. The caller owns
+        the future from here on (`cancel()` no longer touches it) and reads it with
+        `result()`, so a call still in flight is adopted rather than made again."""
+        with self._lock:
+            job = self._jobs.pop((analysis_id, key), None)
+            if job is not None and job[0] != provenance(key, inputs):
+                self._cancel(job)
+                job = None
+        return None if job is None else job[1]
+
+    def result(self, future: Future, timeout: Optional[float] = None) -> Optional[Any]:
+        """A claimed job's result, waiting up to `timeout`; None if it failed, fell back
+        or is still running."""
+        try:
+            value = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            metrics.inc("mystrat_prefetch_total", outcome="timeout")
+            return None
+        except Exception:
+            value = None
+        outcome = "hit" if value is not None else "failed"
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+        metrics.inc("mystrat_prefetch_total", outcome=outcome)
+        return value
+
+    def take(self, analysis_id: str, key: str, inputs: Mapping[str, Any], timeout: Optional[float] = None) -> Optional[Any]:
+        """`claim()` and `result()` in one step."""
+        future = self.claim(analysis_id, key, inputs)
+        return None if future is None else self.result(future, timeout)
+
+    def pending(self, analysis_id: str) -> List[str]:
+        with self._lock:
+            return [key for (aid, key), (_, fut) in self._jobs.items() if aid == analysis_id and not fut.done()]
+
+    def _cancel(self, job: Tuple[str, Future]) -> None:
+        # a call already running cannot be stopped; only count the ones never made
+        if job[1].cancel():
+            self.cancelled += 1
+            metrics.inc("mystrat_prefetch_total", outcome="cancelled")
+
+
+_PREFETCHER_LOCK = threading.Lock()
+_PREFETCHER: Optional[FrameworkPrefetcher] = None
+
+
+def get_prefetcher() -> FrameworkPrefetcher:
+    """The process-wide prefetcher (shared by all sessions)."""
+    global _PREFETCHER
+    with _PREFETCHER_LOCK:
+        if _PREFETCHER is None:
+            _PREFETCHER = FrameworkPrefetcher()
+        return _PREFETCHER
 
 # ---------------------- Quick self-test ----------------------
 if __name__ == "__main__":
@@ -357,3 +1500,14 @@ if __name__ == "__main__":
     print(json.dumps(res, indent=2))
     recs = gen.generate_recommendations(res)
     print(json.dumps(recs, indent=2))
+
+    # the recs context stays within budget, in bounded time, for a very large analysis
+    big = {
+        "SWOT": {q: [f"{q} bullet {i} " * 4 for i in range(1000)] for q in "SWOT"},
+        "Benchmark": {"table": [{"capability": f"Cap {i}", "ACME": "High", "Rival A": "Low"} for i in range(1000)]},
+    }
+    t0 = time.perf_counter()
+    context = _compact_results(big, RECS_CONTEXT_TOKENS)
+    elapsed = time.perf_counter() - t0
+    assert estimate_tokens(context) <= RECS_CONTEXT_TOKENS, estimate_tokens(context)
+    assert elapsed < 0.5, f"_compact_results took {elapsed:.2f}s for 1000-row lists"
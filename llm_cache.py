@@ -0,0 +1,301 @@
+"""
+Persistent, content-addressed LLM response cache for StrategyGenerator.
+
+- `CachingProvider` wraps any LLMProvider; identical prompts are answered from disk
+- Key = sha256 of (model, system prompt, user prompt, temperature, max_tokens)
+- TTL expiry, size-bounded LRU eviction (entries and bytes), hit/miss counters
+- SQLite in WAL mode with one connection per thread, so a single cache file can be
+  shared by every Streamlit session and by several processes
+
+Usage:
+
+    from generate import StrategyGenerator, OpenAIProvider
+    from llm_cache import LLMCache, CachingProvider
+
+    cache = LLMCache(".llm_cache.sqlite", ttl=7 * 24 * 3600)
+    gen = StrategyGenerator(CachingProvider(OpenAIProvider(model="gpt-4o-mini"), cache))
+    ...
+    cache.stats()  # {"hits": .., "misses": .., "evictions": .., "entries": .., "bytes": ..}
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from generate import LLMProvider, clear_finish_reason, last_finish_reason
+
+DEFAULT_CACHE_PATH = os.getenv("MYSTRAT_LLM_CACHE", ".llm_cache.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    response    TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps([model, system_prompt, user_prompt, round(float(temperature), 4), int(max_tokens)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response store.
+
+    `ttl` (seconds, None = never expires) bounds staleness; `max_entries` and
+    `max_bytes` bound the file, evicting least-recently-used responses first.
+    Counters are kept per process (`hits`, `misses`, `evictions`) and also
+    accumulated in the database (`stats(persistent=True)`).
+
+    Lookups are plain reads. LRU order only needs to be roughly right, so a hit
+    re-stamps `accessed_at` at most once per TOUCH_INTERVAL, and those touches and
+    the hit/miss counters are written in one batch with the next put() or every
+    FLUSH_INTERVAL seconds.
+    """
+
+    TOUCH_INTERVAL = 60.0
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        *,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0}  # counter increments not yet in the database
+        self._touched: Dict[str, float] = {}  # key -> accessed_at not yet in the database
+        self._flushed_at = time.time()
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    # ---- Connection handling ----
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str, n: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    # ---- Public API ----
+    def _lookup(self, key: str, now: float) -> Optional[Tuple[str, float, float]]:
+        # plain read: WAL readers never wait on the writer. Expired rows are left
+        # for the next put() to delete.
+        row = self._conn().execute(
+            "SELECT response, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl is not None and row[1] + self.ttl < now):
+            return None
+        return row
+
+    def peek(self, key: str) -> Optional[str]:
+        """The live cached response, without counting a lookup or refreshing its LRU position."""
+        row = self._lookup(key, time.time())
+        return None if row is None else row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self._lookup(key, now)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                self._pending["misses"] += 1
+            else:
+                self.hits += 1
+                self._pending["hits"] += 1
+                if now - row[2] >= self.TOUCH_INTERVAL:
+                    self._touched[key] = now
+            due = now - self._flushed_at >= self.FLUSH_INTERVAL
+        if due:
+            self.flush()
+        metrics.inc("mystrat_cache_total", cache="llm", result="miss" if row is None else "hit")
+        return None if row is None else row[0]
+
+    def flush(self, conn: Optional[sqlite3.Connection] = None) -> None:
+        """Write the batched LRU touches and hit/miss counters. With `conn`, runs
+        inside the caller's open transaction."""
+        with self._lock:
+            pending, touched = self._pending, self._touched
+            self._pending, self._touched = {"hits": 0, "misses": 0}, {}
+            self._flushed_at = time.time()
+        if not touched and not any(pending.values()):
+            return
+        own = conn is None
+        conn = conn or self._conn()
+        if own:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                [(at, key, at) for key, at in touched.items()],
+            )
+            for name, n in pending.items():
+                if n:
+                    self._bump(conn, name, n)
+            if own:
+                conn.execute("COMMIT")
+        except Exception:
+            if own:
+                conn.execute("ROLLBACK")
+            raise
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self.flush(conn)
+            evicted = self._evict(conn, now)
+            if evicted:
+                self._bump(conn, "evictions", evicted)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        evicted = 0
+        if self.ttl is not None:
+            evicted += conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)).rowcount
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return evicted
+        # Walk from least recently used until both bounds hold again
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        return evicted + len(victims)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM responses")
+
+    def stats(self, *, persistent: bool = False) -> Dict[str, Any]:
+        """Counters for this process, or accumulated across all processes."""
+        conn = self._conn()
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if persistent:
+            self.flush()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        else:
+            with self._lock:
+                counters = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+        out = {"hits": counters.get("hits", 0), "misses": counters.get("misses", 0), "evictions": counters.get("evictions", 0)}
+        lookups = out["hits"] + out["misses"]
+        out.update({"hit_rate": (out["hits"] / lookups) if lookups else 0.0, "entries": entries, "bytes": total})
+        return out
+
+
+class CachingProvider(LLMProvider):
+    """LLMProvider wrapper that serves repeated prompts from an `LLMCache`.
+    Empty responses, and responses cut off at max_tokens, are not cached so a
+    transient bad answer is retried next time.
+    """
+
+    def __init__(self, inner: LLMProvider, cache: Optional[LLMCache] = None):
+        self.inner = inner
+        self.cache = cache or LLMCache()
+        self.model = getattr(inner, "model", type(inner).__name__)
+        # one in-flight call per key within this process (avoids paying twice for concurrent identical prompts)
+        self._inflight: Dict[str, List[Any]] = {}  # key -> [lock, waiters]
+        self._inflight_lock = threading.Lock()
+
+    def _key(self, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int) -> str:
+        return cache_key(self.model, system_prompt, user_prompt, temperature, max_tokens)
+
+    def complete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        key = self._key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._inflight_lock:
+            entry = self._inflight.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1  # waiters; the entry lives until the last one leaves
+        try:
+            with entry[0]:
+                # another thread may have filled it while we waited
+                cached = self.cache.peek(key)
+                if cached is not None:
+                    return cached
+                clear_finish_reason()
+                text = self.inner.complete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+                if text and last_finish_reason() != "length":
+                    self.cache.put(key, text)
+                return text
+        finally:
+            with self._inflight_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._inflight[key]
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        key = self._key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        clear_finish_reason()
+        text = await self.inner.acomplete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+        if text and last_finish_reason() != "length":
+            self.cache.put(key, text)
+        return text
+
+    def stream(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> Iterator[str]:
+        key = self._key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        parts: List[str] = []
+        clear_finish_reason()
+        for chunk in self.inner.stream(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens):
+            parts.append(chunk)
+            yield chunk
+        # reached only when the stream ran to completion (an error or an abandoned
+        # stream never gets here); one cut off at max_tokens is not worth replaying
+        text = "".join(parts)
+        if text and last_finish_reason() != "length":
+            self.cache.put(key, text)
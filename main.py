@@ -6,12 +6,15 @@ Streamlit Step‑1 wizard for Strategy Copilot — now wired to generate.py
 """
 
 from __future__ import annotations
-from export_ppt import build_ppt_from_state
+import profiling
+profiling.rerun_started()
 import json
+import time
 import uuid
 from datetime import datetime
 import os
 import streamlit as st
+import metrics
 if "OPENAI_API_KEY" in st.secrets:
     os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
 if "OPENAI_PROJECT" in st.secrets:  # optional
@@ -19,12 +22,21 @@ if "OPENAI_PROJECT" in st.secrets:  # optional
 
 try:
     # These come from the generate.py you added in canvas
-    from generate import StrategyGenerator, OpenAIProvider
+    from generate import StrategyGenerator, OpenAIProvider, get_prefetcher, provenance, stale_frameworks
+    from providers import get_provider, warm_start
 except Exception:  # graceful dev-mode without the module
     StrategyGenerator = None  # type: ignore
     OpenAIProvider = None  # type: ignore
+    get_prefetcher = provenance = stale_frameworks = None  # type: ignore
+    get_provider = warm_start = None  # type: ignore
 
 APP_NAME = "ASK Strategy"
+LLM_MODEL = "gpt-4o-mini"
+PEERS = ["Rival A", "Rival B"]
+# the default selection; generated in the background from Continue on Step 0
+PREFETCH_FRAMEWORKS = ("SWOT", "Ansoff")
+# how long Generate waits, in total, for adopted prefetches still in flight before asking again
+PREFETCH_WAIT_S = float(os.getenv("MYSTRAT_PREFETCH_WAIT_S", "30"))
 
 # -------------------- Page & Session Setup --------------------
 st.set_page_config(page_title=APP_NAME, layout="wide")
@@ -32,8 +44,8 @@ st.set_page_config(page_title=APP_NAME, layout="wide")
 if "step" not in st.session_state:
     st.session_state.step = 0
 
-if "state" not in st.session_state:
-    st.session_state.state = {
+def _new_state():
+    return {
         "analysis_id": str(uuid.uuid4()),
         "company": "",
         "product": "",
@@ -53,13 +65,71 @@ if "state" not in st.session_state:
         "export": {"type": "ppt", "path": None},
     }
 
+
+def _analysis_store():
+    """Process-wide SQLite analysis store, or None if it cannot be opened."""
+    try:
+        from analysis_store import get_store
+
+        return get_store()
+    except Exception:
+        return None
+
+
+def _open_analysis(analysis_id):
+    """Replace the session state with a stored analysis; jumps to review when it has results."""
+    store = _analysis_store()
+    stored = store.load(analysis_id) if store is not None else None
+    if stored is None:
+        return False
+    st.session_state.state = {**_new_state(), **stored, "results": stored["results"]}
+    st.session_state.step = 2 if stored["results"] else 0
+    st.query_params["analysis"] = analysis_id
+    return True
+
+
+if "state" not in st.session_state:
+    # a reload (or another replica) keeps ?analysis=<id>; reopen it from the store
+    # instead of starting over
+    _qid = st.query_params.get("analysis")
+    if not (_qid and _open_analysis(_qid)):
+        st.session_state.state = _new_state()
+
 state = st.session_state.state
 
+
+def _offline_mode() -> bool:
+    """The Step 0 "Run without OpenAI" toggle; on until the user turns it off."""
+    return state.get("offline_mode", True)
+
+# Once offline mode is off, import the OpenAI SDK and open the API connection pool
+# in the background (once per process), so neither blocks this run
+try:
+    if warm_start is not None and os.getenv("OPENAI_API_KEY") and not _offline_mode():
+        warm_start(LLM_MODEL, api_key=os.getenv("OPENAI_API_KEY"))
+except Exception:
+    pass
+
+# Prometheus scrape endpoint (/metrics, /spans), started once per process
+if os.getenv("MYSTRAT_METRICS_PORT"):
+    try:
+        metrics.start_http_server(int(os.environ["MYSTRAT_METRICS_PORT"]))
+    except Exception:
+        pass
+
 # -------------------- Helpers --------------------
 
+def _shared_provider():
+    """Process-wide provider (client, keep-alive pool, rate limiter, cache) or None."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or get_provider is None:
+        return None
+    return get_provider(LLM_MODEL, api_key=api_key)
+
+
 def _get_generator() -> "StrategyGenerator":
     """Return a StrategyGenerator. Falls back to offline if OpenAI not configured."""
-    if StrategyGenerator is None or state.get("offline_mode", False):
+    if StrategyGenerator is None or _offline_mode():
         st.info(
             "`generate.py` not found/importable. The app will still run with a minimal mock.",
             icon="ℹ️",
@@ -99,20 +169,108 @@ def _get_generator() -> "StrategyGenerator":
         return _MockGen()  # type: ignore
 
     # Real generator path
-    provider = None
+    gen = None
     try:
-        import os
-
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key and OpenAIProvider is not None:
-            provider = OpenAIProvider(model="gpt-4o-mini", api_key=api_key)
-            st.caption("LLM mode: OpenAI (gpt-4o-mini)")
+        gen = _openai_generator()
+        if gen is not None:
+            st.caption(f"LLM mode: OpenAI ({LLM_MODEL})")
         else:
             st.caption("LLM mode: Offline fallback (no OPENAI_API_KEY detected)")
     except Exception as e:
         st.caption(f"LLM init issue → Offline fallback: {e}")
+    return gen or _strategy_generator(None)
+
+
+def _strategy_generator(provider) -> "StrategyGenerator":
+    # MYSTRAT_COMBINED=1 asks for all frameworks + recs in one chat completion
+    combined = os.getenv("MYSTRAT_COMBINED", "0") == "1"
+    return StrategyGenerator(provider, max_workers=4, combined=combined)
 
-    return StrategyGenerator(provider)
+
+def _openai_generator():
+    """A StrategyGenerator on the shared OpenAI provider, or None without an API key.
+    Renders nothing, so background paths (prefetch) can use it."""
+    provider = _shared_provider()
+    return None if provider is None else _strategy_generator(provider)
+
+
+def _prerender_deck():
+    """Start rendering the PPTX in the background from the saved state (steps 2–3).
+    Saved edits change the content hash, so the next call renders the new deck.
+    """
+    try:
+        from export_service import prerender
+
+        prerender(state)
+    except Exception:
+        pass
+
+
+def _persist(section=None):
+    """Save the analysis: one section (cheap, after an edit) or everything (after generation)."""
+    store = _analysis_store()
+    if store is None:
+        return
+    try:
+        value = state["recs"] if section == "recs" else state["results"].get(section)
+        if section is None or not store.save_section(state["analysis_id"], section, value):
+            store.save(state)
+        st.query_params["analysis"] = state["analysis_id"]
+    except Exception as e:
+        st.caption(f"Could not save the analysis: {e}")
+
+
+def _generation_inputs():
+    """What the framework prompts are built from (see generate.RESULT_DEPENDS)."""
+    return {"company": state["company"], "product": state["product"], "geo": state.get("geo"), "notes": state.get("notes"), "peers": PEERS}
+
+
+def _prefetch_defaults():
+    """Start the default frameworks in the background while the user picks frameworks.
+    Skipped in offline (mock) mode, without an API key (the offline fallbacks are
+    instant) and for results that are already up to date.
+    """
+    if get_prefetcher is None or _offline_mode():
+        return
+    inputs = _generation_inputs()
+    fws = [f for f in state["frameworks"] if f in PREFETCH_FRAMEWORKS]
+    todo = stale_frameworks(fws, inputs, state["results"], state.get("provenance", {}))
+    if todo:
+        try:
+            gen = _openai_generator()
+            if gen is None:
+                return
+            with metrics.span("analysis.prefetch", analysis_id=state["analysis_id"]) as sp:
+                st.session_state.prefetch_trace = getattr(sp, "trace_id", None)
+                get_prefetcher().start(gen, state["analysis_id"], todo, inputs)
+        except Exception:
+            pass
+
+
+def _cancel_prefetch(**kwargs):
+    if get_prefetcher is not None:
+        get_prefetcher().cancel(state["analysis_id"], **kwargs)
+
+
+def _similar_analyses(limit=3):
+    """Stored analyses matching the current company/product (normalized + trigram), best first."""
+    store = _analysis_store()
+    if store is None or not state["company"].strip():
+        return []
+    try:
+        hits = store.similar(state["company"], state["product"], limit=limit + 1)
+    except Exception:
+        return []
+    return [(row, score) for row, score in hits if row["analysis_id"] != state["analysis_id"]][:limit]
+
+
+def _canonical_inputs(company, product):
+    from names import display_name
+
+    for row, score in _similar_analyses(limit=1):
+        if score == 1.0:
+            return row["company"], row["product"]
+    return display_name(company), display_name(product)
 
 
 def _list_to_text(items):
@@ -127,7 +285,7 @@ def _text_to_list(txt):
 
 def on_generate_click():
      # Choose provider based on toggle
-    provider = None if state.get("offline_mode") else "openai"
+    provider = None if _offline_mode() else "openai"
     
     if not state["company"].strip() or not state["product"].strip():
         st.error("Company and Product are required before generation.")
@@ -136,25 +294,142 @@ def on_generate_click():
         st.error("Select at least one framework.")
         return
 
-    gen = _get_generator()
-    try:
-        with st.spinner("Generating analysis…"):
-            results = gen.generate_selected_frameworks(
-                company=state["company"],
-                product=state["product"],
-                frameworks=state["frameworks"],
-                notes=state.get("notes"),
-                geo=state.get("geo") or None,
-                peers=["Rival A", "Rival B"],
-            )
+    # "Acme robotics " for a stored "ACME Robotics": reuse the stored spelling, so the
+    # prompts (and LLM cache keys) match the earlier generation
+    state["company"], state["product"] = _canonical_inputs(state["company"], state["product"])
+
+    # Generation itself runs on the Step 2 page so quadrants can fill as they stream
+    st.session_state.gen_pending = True
+    st.session_state.step = 2
+
+
+_FW_RESULT_KEY = {"SWOT": "SWOT", "Ansoff": "Ansoff", "Benchmark": "Benchmark", "Fit Matrix": "Fit"}
+_STREAM_COLUMNS = {
+    "SWOT": [("S", "Strengths"), ("W", "Weaknesses"), ("O", "Opportunities"), ("T", "Threats")],
+    "Ansoff": [
+        ("market_penetration", "Market Penetration"),
+        ("market_development", "Market Development"),
+        ("product_development", "Product Development"),
+        ("diversification", "Diversification"),
+    ],
+}
+
+
+def _render_partial(slots, key, value):
+    """Draw a partial/complete framework result into its Step 2 placeholders."""
+    if key in _STREAM_COLUMNS:
+        for (field, _), ph in zip(_STREAM_COLUMNS[key], slots):
+            ph.markdown("\n".join(f"- {x}" for x in value.get(field, [])) or "…")
+    elif key == "Benchmark":
+        slots[0].dataframe(value.get("table", []), use_container_width=True)
+    else:
+        slots[0].json(value)
+
+
+def run_pending_generation():
+    """Regenerate the stale frameworks (streaming into the Step 2 tabs), then recs if their inputs changed."""
+    # one trace per generation: LLM calls, JSON parsing and fallbacks nest under it
+    with metrics.span("analysis.generate", analysis_id=state["analysis_id"]) as sp:
+        st.session_state.last_trace = getattr(sp, "trace_id", None)
+        gen = _get_generator()
+        fws = state["frameworks"]
+        # Each result records a fingerprint of the inputs it was generated from; only
+        # results whose inputs changed (or that are missing) are regenerated, so
+        # adding Benchmark costs one framework call and saved SWOT edits survive
+        inputs = _generation_inputs()
+        recorded = state.setdefault("provenance", {})
+        todo = stale_frameworks(fws, inputs, state["results"], recorded) if stale_frameworks else fws
+        # Frameworks prefetched since Continue (same inputs) are adopted: finished ones
+        # are used as they are and ones still in flight are awaited after the rest is
+        # generated, rather than asked for again
+        claimed = {}
+        if get_prefetcher is not None and todo:
+            for name in todo:
+                future = get_prefetcher().claim(state["analysis_id"], _FW_RESULT_KEY.get(name, name), inputs)
+                if future is not None:
+                    claimed[name] = future
+            todo = [name for name in todo if name not in claimed]
+        kwargs = dict(
+            company=state["company"],
+            product=state["product"],
+            frameworks=todo,
+            notes=state.get("notes"),
+            geo=state.get("geo") or None,
+            peers=PEERS,
+        )
+        try:
+            recs = None
+            results = {}
+            if todo and getattr(gen, "combined", False) and getattr(gen, "provider", None) and todo == fws:
+                # one round trip for frameworks + recommendations
+                with st.spinner("Generating analysis…"):
+                    results, recs = gen.generate_analysis(**kwargs)
+            elif todo and hasattr(gen, "stream_selected_frameworks"):
+                slots = {}
+                for tab, name in zip(st.tabs(todo), todo):
+                    with tab:
+                        key = _FW_RESULT_KEY.get(name, name)
+                        if key in _STREAM_COLUMNS:
+                            cols = st.columns(4)
+                            slots[key] = []
+                            for col, (_, label) in zip(cols, _STREAM_COLUMNS[key]):
+                                col.markdown(f"**{label}**")
+                                slots[key].append(col.empty())
+                        else:
+                            slots[key] = [st.empty()]
+                        slots[key][0].caption("Generating…")
+                finals = {}
+                for key, value, done in gen.stream_selected_frameworks(**kwargs):
+                    if key in slots:
+                        _render_partial(slots[key], key, value)
+                    if done:
+                        finals[key] = value
+                # keep framework order regardless of completion order
+                results = {k: finals[k] for k in ("SWOT", "Ansoff", "Benchmark", "Fit") if k in finals}
+            elif todo:
+                with st.spinner("Generating analysis…"):
+                    results = gen.generate_selected_frameworks(**kwargs)
+            prefetched, retry = {}, []
+            if claimed:
+                deadline = time.monotonic() + PREFETCH_WAIT_S
+                with st.spinner("Generating analysis…"):
+                    for name, future in claimed.items():
+                        value = get_prefetcher().result(future, timeout=max(0.0, deadline - time.monotonic()))
+                        if value is not None:
+                            prefetched[_FW_RESULT_KEY.get(name, name)] = value
+                        else:  # failed, fell back to canned content, or still stuck after PREFETCH_WAIT_S
+                            retry.append(name)
+                    if retry:
+                        results.update(gen.generate_selected_frameworks(**{**kwargs, "frameworks": retry}))
+            # never let a generator that returns extra frameworks overwrite fresh (possibly edited) ones
+            todo_keys = {_FW_RESULT_KEY.get(name, name) for name in todo + retry}
+            results = {k: v for k, v in results.items() if k in todo_keys}
+            results.update(prefetched)
             state["results"].update(results)
-            # Auto-generate recommendations
-            state["recs"] = gen.generate_recommendations(state["results"])
-        st.toast("Analysis generated.", icon="✅")
-        st.session_state.step = 2
-        st.rerun()
-    except Exception as e:
-        st.error(f"Generation failed: {e}")
+            if provenance:
+                recorded.update({key: provenance(key, inputs) for key in results})
+                recs_fp = provenance("recs", {"results": state["results"]})
+            else:
+                recs_fp = None
+            if recs is None and (recs_fp is None or recorded.get("recs") != recs_fp or not state["recs"]):
+                with st.spinner("Drafting recommendations…"):
+                    # Auto-generate recommendations
+                    recs = gen.generate_recommendations(state["results"])
+            if recs is not None:
+                state["recs"] = recs
+                if recs_fp:
+                    recorded["recs"] = recs_fp
+            _persist()
+            if results or recs is not None:
+                st.toast("Analysis generated.", icon="✅")
+            else:
+                st.toast("Analysis is up to date — nothing to regenerate.", icon="✅")
+        except Exception as e:
+            st.session_state.gen_error = f"Generation failed: {e}"
+            st.session_state.step = 1
+        finally:
+            st.session_state.gen_pending = False
+    st.rerun()
 
 
 # -------------------- UI --------------------
@@ -168,11 +443,12 @@ if st.session_state.step == 0:
     state["product"] = st.text_input("Product/Line *", state["product"], max_chars=80, placeholder="e.g., Edge IoT Sensors")
     state["geo"] = st.selectbox("Geography (optional)", ["", "US", "EU", "APAC"], index=0)
     state["notes"] = st.text_area("Notes (optional)", value=state["notes"] or "", height=100)
+    _cancel_prefetch(inputs=_generation_inputs())  # edited inputs invalidate a running prefetch
 
     # Offline test toggle (no OpenAI calls)
     state["offline_mode"] = st.checkbox(
         "Run without OpenAI (offline mock)",
-        value=state.get("offline_mode", True),
+        value=_offline_mode(),
         help="Use a local mock generator so you can test without API keys/costs."
     )
 
@@ -182,17 +458,47 @@ if st.session_state.step == 0:
             if not state["company"].strip() or not state["product"].strip():
                 st.error("Company and Product are required.")
             else:
+                state["company"], state["product"] = _canonical_inputs(state["company"], state["product"])
+                _prefetch_defaults()
                 st.session_state.step = 1
                 st.rerun()
     with col2:
         st.button("Cancel", use_container_width=True)
 
+    # Saved analyses reopen from the store without any LLM calls
+    _store = _analysis_store()
+    _recent = _store.recent(limit=20) if _store is not None else []
+    if _recent:
+        with st.expander("Reopen a saved analysis"):
+            labels = {
+                r["analysis_id"]: f"{r['company']} — {r['product']} ({datetime.fromtimestamp(r['updated_at']):%Y-%m-%d %H:%M})"
+                for r in _recent
+            }
+            pick = st.selectbox("Saved analyses", list(labels), format_func=labels.get)
+            if st.button("Open", key="open_saved") and _open_analysis(pick):
+                st.rerun()
+
 # Step 1 — Framework selection
 elif st.session_state.step == 1:
     st.subheader("Select frameworks")
+    if st.session_state.get("gen_error"):
+        st.error(st.session_state.pop("gen_error"))
     available = ["SWOT", "Ansoff", "Benchmark", "Fit Matrix"]
     selected = st.multiselect("Choose 1–4", options=available, default=state.get("frameworks", ["SWOT", "Ansoff"]))
     state["frameworks"] = selected
+    _cancel_prefetch(keep=[_FW_RESULT_KEY.get(name, name) for name in selected])
+
+    # Offer earlier analyses of the same company/product before paying for a new one
+    matches = _similar_analyses()
+    if matches:
+        st.info("Existing analyses match these inputs — reuse one instead of generating again?", icon="♻️")
+        for row, score in matches:
+            c1, c2 = st.columns([4, 1])
+            c1.write(
+                f"**{row['company']} — {row['product']}** · {', '.join(row['frameworks'])} · "
+                f"{datetime.fromtimestamp(row['updated_at']):%Y-%m-%d} · match {score:.0%}"
+            )
+            c2.button("Reuse", key=f"reuse_{row['analysis_id']}", on_click=_open_analysis, args=(row["analysis_id"],))
 
     col1, col2 = st.columns(2)
     with col1:
@@ -204,6 +510,8 @@ elif st.session_state.step == 1:
 elif st.session_state.step == 2:
     st.subheader("Analysis")
     fws = state.get("frameworks", [])
+    if st.session_state.get("gen_pending"):
+        run_pending_generation()
     if not fws:
         st.warning("No frameworks selected. Go back and choose at least one.")
     else:
@@ -231,6 +539,7 @@ elif st.session_state.step == 2:
                             "O": _text_to_list(new_O),
                             "T": _text_to_list(new_T),
                         }
+                        _persist("SWOT")
                         st.toast("SWOT saved.", icon="💾")
 
                 elif name == "Ansoff":
@@ -251,6 +560,7 @@ elif st.session_state.step == 2:
                             "product_development": _text_to_list(pd),
                             "diversification": _text_to_list(dv),
                         }
+                        _persist("Ansoff")
                         st.toast("Ansoff saved.", icon="💾")
 
                 elif name == "Benchmark":
@@ -261,6 +571,8 @@ elif st.session_state.step == 2:
                     st.write("Fit Matrix (read‑only preview). Add editing in Step 2.")
                     st.json(state["results"].get("Fit", {}))
 
+    _prerender_deck()
+
     col1, col2 = st.columns(2)
     with col1:
         st.button("Back", on_click=lambda: st.session_state.update(step=1), use_container_width=True)
@@ -281,9 +593,11 @@ elif st.session_state.step == 3:
         submitted = st.form_submit_button("Add")
         if submitted and title.strip():
             state["recs"].append({"title": title.strip(), "impact": impact, "effort": effort, "rationale": rationale.strip()})
+            _persist("recs")
             st.toast("Recommendation added.", icon="➕")
 
     st.dataframe(state["recs"], use_container_width=True)
+    _prerender_deck()
 
     col1, col2 = st.columns(2)
     with col1:
@@ -297,10 +611,14 @@ elif st.session_state.step == 4:
     export_type = st.radio("Choose format", ["PowerPoint", "JSON"], index=1)
 
     if export_type == "PowerPoint":
-        bio, fname = build_ppt_from_state(state)
+        from export_ppt import build_ppt_cached  # python-pptx/lxml load only here
+
+        # re-rendered only when company/product/frameworks/results/recs change
+        with metrics.span("analysis.export", analysis_id=state["analysis_id"]):
+            data, fname = build_ppt_cached(state)
         st.download_button(
             "Download PPTX",
-            data=bio.getvalue(),
+            data=data,
             file_name=fname,
             mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
             use_container_width=True,
@@ -334,6 +652,22 @@ elif st.session_state.step == 4:
         use_container_width=True,
     )
 
-    st.caption("PowerPoint export will add slides for: Title, Agenda, SWOT, Ansoff, Benchmark, Top‑5 Recs.")
+    # same count as the deck's "Top N Recommendations" slide (export_ppt.slide_recommendations)
+    _recs_label = f", Top {len(state['recs'])} Recs" if state.get("recs") else ""
+    st.caption(f"PowerPoint export will add slides for: Title, Agenda, SWOT, Ansoff, Benchmark{_recs_label}.")
 
     st.button("Back", on_click=lambda: st.session_state.update(step=3))
+
+# -------------------- Profiling --------------------
+profiling.rerun_finished(st.session_state.step)
+if os.getenv("MYSTRAT_PROFILE") == "1":
+    with st.sidebar.expander("Startup profile"):
+        st.json(profiling.report())
+    with st.sidebar.expander("Metrics & traces"):
+        for label, key in (("Last generation", "last_trace"), ("Background prefetch", "prefetch_trace")):
+            if st.session_state.get(key):
+                st.caption(f"{label} — ms per span (llm.* vs parse.* vs pptx.*)")
+                st.json(metrics.trace_breakdown(st.session_state[key]))
+        st.json(metrics.summary())
+        st.download_button("Prometheus metrics", metrics.prometheus_text(), file_name="metrics.prom", mime="text/plain")
+        st.download_button("Spans (JSON lines)", metrics.spans_jsonl(), file_name="spans.jsonl", mime="application/x-ndjson")
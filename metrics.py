@@ -0,0 +1,375 @@
+"""
+Metrics and tracing for the generate → export hot path.
+
+- `span(name, **attrs)` times a block. Spans nest per thread (per asyncio task)
+  and share a trace id with their parent; `attach(parent)` carries a trace into
+  a worker thread. Every finished span feeds the `mystrat_span_seconds`
+  histogram and a ring buffer of recent spans
+- `inc()` / `observe()` / `set_gauge()` for counters (cache hits, retries,
+  fallbacks), size histograms (deck bytes, slide/shape counts) and gauges
+- Exports: `prometheus_text()` (text exposition format 0.0.4, also served by
+  `start_http_server()` / MYSTRAT_METRICS_PORT), `spans_jsonl()` and
+  MYSTRAT_TRACE_FILE (one JSON line per finished span), `summary()` for the
+  Streamlit debug panel (main.py, MYSTRAT_PROFILE=1)
+- MYSTRAT_METRICS=0 turns spans into no-ops; counters stay (they are cheap)
+
+Usage:
+
+    import metrics
+    with metrics.span("llm.complete", section="SWOT"):
+        text = provider.complete(...)
+    metrics.inc("mystrat_fallbacks_total", result="SWOT")
+    print(metrics.prometheus_text())
+
+Only the standard library is used, so every module can import this one.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+ENABLED = os.getenv("MYSTRAT_METRICS", "1") != "0"
+TRACE_FILE = os.getenv("MYSTRAT_TRACE_FILE")
+
+# seconds: slide builders land in the low buckets, LLM calls in the high ones
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6, 2e7)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+_LOCK = threading.Lock()
+_COUNTERS: Dict[Tuple[str, _Labels], float] = {}
+_GAUGES: Dict[Tuple[str, _Labels], float] = {}
+_HISTOGRAMS: Dict[Tuple[str, _Labels], "_Histogram"] = {}
+_SPANS: deque = deque(maxlen=2000)
+# open spans, innermost last; a ContextVar so asyncio tasks sharing a thread keep separate stacks
+_STACK: ContextVar[Tuple["Span", ...]] = ContextVar("mystrat_span_stack", default=())
+
+
+def _labels(labels: Dict[str, Any]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+# ---------------------- Metrics ----------------------
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    key = (name, _labels(labels))
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: Any) -> None:
+    with _LOCK:
+        _GAUGES[(name, _labels(labels))] = float(value)
+
+
+def observe(name: str, value: float, *, buckets: Sequence[float] = TIME_BUCKETS, **labels: Any) -> None:
+    key = (name, _labels(labels))
+    with _LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = _Histogram(buckets)
+        hist.observe(value)
+
+
+# ---------------------- Spans ----------------------
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start", "duration_s", "status", "thread")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration_s = 0.0
+        self.status = "ok"
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "start": round(self.start, 6), "duration_ms": round(self.duration_s * 1000, 3),
+            "status": self.status, "thread": self.thread, "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    stack = _STACK.get()
+    return stack[-1] if stack else None
+
+
+def _pop(token: Any) -> None:
+    try:
+        _STACK.reset(token)
+    except ValueError:  # a generator closed from another context (e.g. by the GC)
+        pass
+
+
+@contextmanager
+def attach(parent: Optional[Span]) -> Iterator[None]:
+    """Make `parent` (from `current_span()` on another thread) the parent of spans opened here."""
+    if parent is None or not ENABLED:
+        yield
+        return
+    token = _STACK.set(_STACK.get() + (parent,))
+    try:
+        yield
+    finally:
+        _pop(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    """Time the block as span `name`; yields the span so callers can `.set()` attributes."""
+    if not ENABLED:
+        yield _NOOP
+        return
+    stack = _STACK.get()
+    sp = Span(name, stack[-1] if stack else None, attrs)
+    token = _STACK.set(stack + (sp,))
+    t0 = time.perf_counter()
+    try:
+        yield sp
+    except BaseException as e:
+        sp.status = "error"
+        sp.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        sp.duration_s = time.perf_counter() - t0
+        _pop(token)
+        _finish(sp)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `span(name)`."""
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def _finish(sp: Span) -> None:
+    observe("mystrat_span_seconds", sp.duration_s, span=sp.name)
+    if sp.status == "error":
+        inc("mystrat_span_errors_total", span=sp.name)
+    record = sp.to_dict()
+    with _LOCK:
+        _SPANS.append(record)
+    if TRACE_FILE:
+        _trace_writer().put(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+class _TraceWriter:
+    """Appends queued JSON lines to TRACE_FILE from one daemon thread through one
+    long-lived handle, so finishing a span never waits on file I/O."""
+
+    def __init__(self, path: str) -> None:
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="mystrat-trace-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, line: str) -> None:
+        self._queue.put(line)
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                break
+            self._file.write(line)
+            if self._queue.empty():
+                self._file.flush()
+        self._file.close()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+_WRITER: Optional[_TraceWriter] = None
+
+
+def _trace_writer() -> _TraceWriter:
+    global _WRITER
+    if _WRITER is None:
+        with _LOCK:
+            if _WRITER is None:
+                _WRITER = _TraceWriter(TRACE_FILE)
+    return _WRITER
+
+
+def recent_spans(n: int = 200, *, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    with _LOCK:
+        spans = list(_SPANS)
+    if trace_id is not None:
+        spans = [s for s in spans if s["trace_id"] == trace_id]
+    return spans[-n:]
+
+
+# ---------------------- Exports ----------------------
+
+def spans_jsonl(n: Optional[int] = None) -> str:
+    spans = recent_spans(n or _SPANS.maxlen)
+    return "".join(json.dumps(s, ensure_ascii=False, default=str) + "\n" for s in spans)
+
+
+def _fmt_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def prometheus_text() -> str:
+    """All counters, gauges and histograms in the Prometheus text format."""
+    with _LOCK:
+        counters = sorted(_COUNTERS.items())
+        gauges = sorted(_GAUGES.items())
+        hists = sorted((k, (h.buckets, list(h.counts), h.sum, h.count)) for k, h in _HISTOGRAMS.items())
+    lines: List[str] = []
+    typed = set()
+    for kind, items in (("counter", counters), ("gauge", gauges)):
+        for (name, labels), value in items:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+    for (name, labels), (buckets, counts, total, count) in hists:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, c in zip(buckets, counts):
+            cumulative += c
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', _fmt_value(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(round(total, 6))}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def summary(n: int = 2000) -> Dict[str, Any]:
+    """Per-span count/total/p50/p95 (ms) over recent spans, plus every counter."""
+    by_name: Dict[str, List[float]] = {}
+    for s in recent_spans(n):
+        by_name.setdefault(s["name"], []).append(s["duration_ms"])
+
+    def _pct(values: List[float], p: float) -> float:
+        return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+    spans = {}
+    for name, values in sorted(by_name.items(), key=lambda kv: -sum(kv[1])):
+        values.sort()
+        spans[name] = {
+            "count": len(values), "total_ms": round(sum(values), 1),
+            "p50_ms": round(_pct(values, 50), 2), "p95_ms": round(_pct(values, 95), 2),
+        }
+    with _LOCK:
+        counters = {f"{name}{_fmt_labels(labels)}": value for (name, labels), value in sorted(_COUNTERS.items())}
+    return {"spans": spans, "counters": counters}
+
+
+def trace_breakdown(trace_id: str) -> Dict[str, float]:
+    """Milliseconds per span name within one trace (e.g. llm.* vs parse.* vs pptx.*)."""
+    out: Dict[str, float] = {}
+    for s in recent_spans(_SPANS.maxlen, trace_id=trace_id):
+        out[s["name"]] = round(out.get(s["name"], 0.0) + s["duration_ms"], 3)
+    return out
+
+
+def reset() -> None:
+    with _LOCK:
+        _COUNTERS.clear()
+        _GAUGES.clear()
+        _HISTOGRAMS.clear()
+        _SPANS.clear()
+
+
+# ---------------------- HTTP endpoint ----------------------
+
+_SERVER_LOCK = threading.Lock()
+_SERVER: Any = None
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0") -> Any:
+    """Serve /metrics (Prometheus) and /spans (JSON lines) on a daemon thread; once per process."""
+    global _SERVER
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.startswith("/metrics"):
+                body, ctype = prometheus_text(), "text/plain; version=0.0.4"
+            elif self.path.startswith("/spans"):
+                body, ctype = spans_jsonl(), "application/x-ndjson"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            _SERVER = ThreadingHTTPServer((addr, port), _Handler)
+            threading.Thread(target=_SERVER.serve_forever, name="metrics-http", daemon=True).start()
+        return _SERVER
@@ -0,0 +1,218 @@
+"""
+Local stand-in LLM provider with realistic latency, errors and streaming.
+
+- Latency distributions: fixed, uniform, lognormal (time-to-first-token) plus a
+  token rate for the body of the answer
+- Error and 429 injection (exceptions carry `status_code`, so ratelimit.classify
+  treats them like the real API's)
+- `stream()` emits the answer at `tokens_per_sec`
+- Outputs are schema-valid for every prompt in generate.py (SWOT, Ansoff,
+  Benchmark, recommendations and the combined prompt), deterministic per prompt
+
+Usage:
+
+    from mock_llm import SimulatedProvider
+    provider = SimulatedProvider(latency="lognormal", latency_ms=600, tokens_per_sec=80, rate_limit_rate=0.05)
+    gen = StrategyGenerator(provider, max_workers=4)
+
+No network access; nothing is imported beyond the standard library and generate.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from generate import LLMProvider
+
+_WORDS = [
+    "channel", "pricing", "platform", "partner", "security", "analytics", "bundle", "onboarding",
+    "retention", "mid-market", "enterprise", "integration", "support", "brand", "pipeline", "region",
+    "OEM", "automation", "compliance", "marketplace", "upsell", "pilot", "vertical", "managed",
+]
+_RATINGS = ["Low", "Medium", "High", "Best-in-class"]
+
+
+class SimulatedAPIError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SimulatedProvider(LLMProvider):
+    """Configurable offline provider for load tests and benchmarks.
+
+    `latency_ms` is the median time to first token; `latency` picks the shape
+    ("fixed", "uniform" = +/- `jitter`, "lognormal" with sigma `jitter`).
+    `tokens_per_sec` adds answer-length-proportional time (0 disables).
+    `error_rate` raises 500s and `rate_limit_rate` raises 429s before any output.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: str = "lognormal",
+        latency_ms: float = 500.0,
+        jitter: float = 0.4,
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+        model: str = "simulated",
+    ):
+        if latency not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution: {latency}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.model = model
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"calls": 0, "errors": 0, "throttles": 0}
+
+    # ---- Simulation knobs ----
+    def _first_token_s(self) -> float:
+        with self._lock:
+            if self.latency == "fixed":
+                ms = self.latency_ms
+            elif self.latency == "uniform":
+                ms = self.latency_ms * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            else:
+                ms = self._rng.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.jitter)
+        return max(0.0, ms) / 1000.0
+
+    def _maybe_fail(self) -> None:
+        with self._lock:
+            self.counters["calls"] += 1
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.counters["throttles"] += 1
+                raise SimulatedAPIError("simulated rate limit", 429)
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counters["errors"] += 1
+                raise SimulatedAPIError("simulated server error", 500)
+
+    def _body_s(self, text: str) -> float:
+        return (len(text) / 4) / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    # ---- LLMProvider ----
+    def complete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        delay = self._first_token_s()
+        try:
+            self._maybe_fail()
+        except SimulatedAPIError:
+            time.sleep(delay / 4)  # errors come back faster than answers
+            raise
+        text = respond(user_prompt)
+        time.sleep(delay + self._body_s(text))
+        return text
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        delay = self._first_token_s()
+        try:
+            self._maybe_fail()
+        except SimulatedAPIError:
+            await asyncio.sleep(delay / 4)
+            raise
+        text = respond(user_prompt)
+        await asyncio.sleep(delay + self._body_s(text))
+        return text
+
+    def stream(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> Iterator[str]:
+        delay = self._first_token_s()
+        try:
+            self._maybe_fail()
+        except SimulatedAPIError:
+            time.sleep(delay / 4)
+            raise
+        text = respond(user_prompt)
+        time.sleep(delay)
+        if self.tokens_per_sec <= 0:
+            yield text
+            return
+        step = 32  # ~8 tokens per chunk
+        for i in range(0, len(text), step):
+            chunk = text[i:i + step]
+            time.sleep(self._body_s(chunk))
+            yield chunk
+
+
+# ---------------------- Schema-valid answers ----------------------
+
+def _rng_for(prompt: str) -> random.Random:
+    return random.Random(int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def _bullets(rng: random.Random, n: int) -> List[str]:
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 5))).capitalize() for _ in range(n)]
+
+
+def _swot(rng: random.Random) -> Dict[str, List[str]]:
+    return {k: _bullets(rng, rng.randint(3, 5)) for k in ("S", "W", "O", "T")}
+
+
+def _ansoff(rng: random.Random) -> Dict[str, List[str]]:
+    keys = ("market_penetration", "market_development", "product_development", "diversification")
+    return {k: _bullets(rng, rng.randint(2, 4)) for k in keys}
+
+
+def _benchmark(rng: random.Random, company: str, peers: List[str], caps: List[str]) -> Dict[str, Any]:
+    table = []
+    for cap in caps:
+        row = {"capability": cap, company: rng.choice(_RATINGS)}
+        for p in peers:
+            row[p] = rng.choice(_RATINGS)
+        table.append(row)
+    return {"peers": peers, "table": table}
+
+
+def _recs(rng: random.Random, n: int) -> List[Dict[str, Any]]:
+    return [
+        {"title": t, "impact": rng.randint(1, 5), "effort": rng.randint(1, 5), "rationale": " ".join(_bullets(rng, 1))}
+        for t in _bullets(rng, n)
+    ]
+
+
+def _csv(text: str) -> List[str]:
+    return [x.strip() for x in text.split(",") if x.strip()]
+
+
+def respond(user_prompt: str) -> str:
+    """A deterministic, schema-valid JSON answer for any generate.py prompt."""
+    rng = _rng_for(user_prompt)
+    if "top-level keys:" in user_prompt:
+        keys = _csv(re.search(r"top-level keys: (.+?)\.\n", user_prompt + "\n").group(1))
+        doc: Dict[str, Any] = {}
+        for key in keys:
+            if key == "SWOT":
+                doc[key] = _swot(rng)
+            elif key == "Ansoff":
+                doc[key] = _ansoff(rng)
+            elif key == "Benchmark":
+                m = re.search(r"rate (.+?) vs peers (.+?) on: (.+?)\. Ratings", user_prompt)
+                doc[key] = _benchmark(rng, m.group(1), _csv(m.group(2)), _csv(m.group(3))) if m else {"table": []}
+            elif key == "recs":
+                m = re.search(r'"recs": array of (\d+)', user_prompt)
+                doc[key] = _recs(rng, int(m.group(1)) if m else 5)
+        return json.dumps(doc, ensure_ascii=False)
+    # recs first: its prompt embeds the analysis JSON, which mentions the other keys
+    m = re.search(r"JSON array of (\d+) recommendation", user_prompt)
+    if m:
+        return json.dumps(_recs(rng, int(m.group(1))), ensure_ascii=False)
+    if "keys S, W, O, T" in user_prompt:
+        return json.dumps(_swot(rng), ensure_ascii=False)
+    if "market_penetration" in user_prompt:
+        return json.dumps(_ansoff(rng), ensure_ascii=False)
+    m = re.search(r"Compare (.+?) \(.*?\) against peers: (.+?)\.\nCapabilities to rate: (.+?)\.\n", user_prompt)
+    if m:
+        return json.dumps(_benchmark(rng, m.group(1), _csv(m.group(2)), _csv(m.group(3))), ensure_ascii=False)
+    return "{}"
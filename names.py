@@ -0,0 +1,162 @@
+"""
+Company/product name normalization and fuzzy lookup of prior analyses.
+
+- `normalize_company()` / `normalize_product()` give the matching key: Unicode
+  NFKC, case-folded, punctuation and repeated whitespace removed, legal suffixes
+  ("Inc.", "GmbH", "Ltd" …) dropped from company names, then the alias table applied
+- The alias table maps variants to one canonical name ("IBM" -> "International
+  Business Machines"); it is read from the JSON file named by MYSTRAT_ALIASES and
+  can be extended at runtime with `add_alias()`
+- `TrigramIndex` is an in-memory inverted index of character trigrams over
+  (company, product) keys; `search()` ranks candidates by trigram similarity
+  and only scores entries that share at least one trigram with the query
+
+Usage:
+
+    from names import normalize_company, TrigramIndex
+    normalize_company("ACME Robotics Inc. ")        # "acme robotics"
+    idx = TrigramIndex()
+    idx.add("a1", "ACME Robotics", "Edge IoT Sensors")
+    idx.search("Acme robotics", "edge iot sensor")  # [("a1", 0.93)]
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_ALIASES_PATH = os.getenv("MYSTRAT_ALIASES")
+
+# compared after normalization, so "Inc." / "inc" / "INC" are all "inc"
+LEGAL_SUFFIXES = frozenset(
+    """
+    inc incorporated corp corporation co company cos ltd limited llc llp lp plc
+    gmbh ag kg kgaa se sa sas sarl sl srl spa nv bv oy oyj ab asa as aps
+    pty pte bhd kk
+    """.split()
+)
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_ALIASES: Dict[str, str] = {}
+_ALIASES_LOCK = threading.RLock()  # re-entered: the first lookup loads the file through add_alias()
+_ALIASES_LOADED = False
+
+
+def _fold(text: Optional[str]) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold().replace("&", " and ")
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def _aliases() -> Dict[str, str]:
+    global _ALIASES_LOADED
+    if not _ALIASES_LOADED:
+        with _ALIASES_LOCK:
+            if not _ALIASES_LOADED and DEFAULT_ALIASES_PATH:
+                load_aliases(DEFAULT_ALIASES_PATH)
+            _ALIASES_LOADED = True
+    return _ALIASES
+
+
+def load_aliases(path: str) -> int:
+    """Merge a JSON object {"alias": "canonical name", ...} into the alias table; returns its size."""
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    for alias, canonical in table.items():
+        add_alias(alias, canonical)
+    return len(_ALIASES)
+
+
+def add_alias(alias: str, canonical: str) -> None:
+    # keyed both as typed and without legal suffixes, so one entry serves products and companies
+    target = _strip_suffixes(_fold(canonical))
+    with _ALIASES_LOCK:
+        _ALIASES[_fold(alias)] = target
+        _ALIASES[_strip_suffixes(_fold(alias))] = target
+
+
+def _strip_suffixes(key: str) -> str:
+    words = key.split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_company(text: Optional[str]) -> str:
+    key = _strip_suffixes(_fold(text))
+    return _aliases().get(key, key)
+
+
+def normalize_product(text: Optional[str]) -> str:
+    key = _fold(text)
+    return _aliases().get(key, key)
+
+
+def display_name(text: Optional[str]) -> str:
+    """User input with surrounding/repeated whitespace removed (case and suffixes kept)."""
+    return " ".join((text or "").split())
+
+
+# ---------------------- Trigram index ----------------------
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Fuzzy (company, product) lookup. Not thread-safe for writes; callers lock."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._entries: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry_id: str, company: str, product: str) -> None:
+        self.remove(entry_id)
+        company_grams = trigrams(normalize_company(company))
+        product_grams = trigrams(normalize_product(product))
+        self._entries[entry_id] = (company_grams, product_grams)
+        for g in company_grams:
+            self._postings[g].add(entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        old = self._entries.pop(entry_id, None)
+        if old is not None:
+            for g in old[0]:
+                self._postings[g].discard(entry_id)
+
+    def add_many(self, rows: Iterable[Tuple[str, str, str]]) -> None:
+        for entry_id, company, product in rows:
+            self.add(entry_id, company, product)
+
+    def search(
+        self, company: str, product: Optional[str] = None, *, limit: int = 5, min_score: float = 0.5
+    ) -> List[Tuple[str, float]]:
+        """(entry_id, score) best first. Score is the Jaccard similarity of the company
+        trigrams, averaged with the product's when `product` is given.
+        """
+        q_company = trigrams(normalize_company(company))
+        q_product = trigrams(normalize_product(product)) if product else None
+        shared: Counter = Counter()
+        for g in q_company:
+            shared.update(self._postings.get(g, ()))
+        scored = []
+        for entry_id, n in shared.items():
+            company_grams, product_grams = self._entries[entry_id]
+            score = n / (len(q_company) + len(company_grams) - n)
+            if q_product is not None:
+                score = (score + _jaccard(q_product, product_grams)) / 2
+            if score >= min_score:
+                scored.append((entry_id, round(score, 3)))
+        scored.sort(key=lambda e: -e[1])
+        return scored[:limit]
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
@@ -0,0 +1,148 @@
+"""
+Import-time and startup profiling for the Streamlit entry points.
+
+- `python profiling.py` imports what main.py loads on every run (and, separately,
+  the modules it defers) in fresh interpreters with `-X importtime`, and prints
+  the slowest imports; `--json` for machine-readable output
+- In the app, `rerun_started()` / `rerun_finished()` bracket each script run;
+  `report()` gives the cold start (first run), per-rerun percentiles and which
+  heavy modules are currently loaded. main.py shows it in the sidebar when
+  MYSTRAT_PROFILE=1.
+
+Usage:
+
+    python profiling.py                         # cold path vs deferred modules
+    python profiling.py export_ppt openai --top 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+_T0 = time.perf_counter()  # as close to process start as main.py lets us get
+
+# modules main.py must not load until a step needs them
+HEAVY_MODULES = ("pptx", "lxml", "numpy", "openai", "httpx", "httpx2")
+COLD_PATH = ("streamlit", "generate", "providers")
+DEFERRED = ("export_ppt", "openai")
+
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_RERUNS: deque = deque(maxlen=500)
+_FIRST_RUN_S: Optional[float] = None
+
+
+# ---------------------- In-app timings ----------------------
+
+def rerun_started() -> None:
+    _LOCAL.t0 = time.perf_counter()
+
+
+def rerun_finished(step: Any = None) -> Optional[float]:
+    """Record the script run started by `rerun_started()` on this thread; returns seconds."""
+    global _FIRST_RUN_S
+    t0 = getattr(_LOCAL, "t0", None)
+    if t0 is None:
+        return None
+    _LOCAL.t0 = None
+    now = time.perf_counter()
+    with _LOCK:
+        if _FIRST_RUN_S is None:
+            _FIRST_RUN_S = now - _T0
+        _RERUNS.append((step, now - t0))
+    return now - t0
+
+
+def loaded_heavy_modules() -> List[str]:
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def report() -> Dict[str, Any]:
+    with _LOCK:
+        runs = list(_RERUNS)
+        first = _FIRST_RUN_S
+    durations = sorted(d for _, d in runs)
+
+    def _pct(p: float) -> float:
+        return round(durations[min(len(durations) - 1, int(p / 100 * len(durations)))] * 1000, 1) if durations else 0.0
+
+    by_step: Dict[str, List[float]] = {}
+    for step, d in runs:
+        by_step.setdefault(str(step), []).append(d)
+    return {
+        "cold_start_ms": round(first * 1000, 1) if first is not None else None,
+        "reruns": len(durations),
+        "rerun_ms": {"p50": _pct(50), "p95": _pct(95), "max": _pct(100)},
+        "rerun_ms_by_step": {k: round(statistics.fmean(v) * 1000, 1) for k, v in sorted(by_step.items())},
+        "heavy_modules_loaded": loaded_heavy_modules(),
+    }
+
+
+# ---------------------- Import-time profiling ----------------------
+
+def import_times(modules: Sequence[str], *, top: int = 15) -> Dict[str, Any]:
+    """Import `modules` in a fresh interpreter with -X importtime.
+
+    Returns the total cumulative import time, the wall time of the interpreter,
+    the `top` slowest imports (cumulative) and self time grouped by top-level package.
+    """
+    code = "import " + ", ".join(modules)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:   self |   cumulative | <2 spaces per nesting level>name"
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        entries.append((name[1:].rstrip(), int(self_us), int(cum_us)))
+    top_level = [(n, c) for n, _, c in entries if not n.startswith(" ")]
+    packages: Dict[str, int] = {}
+    for n, s, _ in entries:
+        pkg = n.strip().split(".")[0]
+        packages[pkg] = packages.get(pkg, 0) + s
+    return {
+        "modules": list(modules),
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "total_ms": round(sum(c for _, c in top_level) / 1000, 1),
+        "wall_ms": round(wall * 1000, 1),
+        "top": [(n.strip(), round(c / 1000, 1)) for n, _, c in sorted(entries, key=lambda e: -e[2])[:top]],
+        "packages_ms": {k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])[:top]},
+    }
+
+
+def _print(result: Dict[str, Any]) -> None:
+    status = "" if result["ok"] else f"  (failed: {result['error']})"
+    print(f"import {', '.join(result['modules'])}: {result['total_ms']} ms imports, {result['wall_ms']} ms wall{status}")
+    for name, ms in result["top"]:
+        print(f"  {ms:>9.1f} ms  {name}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Import-time profile of the app's cold path.")
+    ap.add_argument("modules", nargs="*", help="modules to profile (default: cold path, then each deferred module)")
+    ap.add_argument("--top", type=int, default=12)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    groups = [args.modules] if args.modules else [list(COLD_PATH)] + [[m] for m in DEFERRED]
+    results = [import_times(g, top=args.top) for g in groups]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            _print(r)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Process-wide LLM provider registry with a shared HTTP connection pool.
+
+- `get_provider()` returns the same fully wrapped provider (OpenAI -> rate limiter
+  -> response cache) for identical settings, across Streamlit reruns and sessions
+- Every OpenAI client in the process shares one keep-alive pool sized by `PoolSettings`
+  (one sync pool, plus one async pool for `get_provider(..., asynchronous=True)`)
+- `prewarm()` opens pooled connections (DNS + TLS) in the background at app start,
+  so the first "Generate analysis" does not pay the handshake
+- `warm_start()` does the provider build (OpenAI SDK import) and prewarm off-thread
+
+Usage:
+
+    from providers import get_provider, prewarm
+
+    provider = get_provider("gpt-4o-mini")   # built once per process
+    prewarm(provider)                        # fire-and-forget
+    gen = StrategyGenerator(provider, max_workers=4)
+
+Pool sizing comes from `PoolSettings.from_env()`:
+MYSTRAT_HTTP_MAX_CONNECTIONS, MYSTRAT_HTTP_MAX_KEEPALIVE, MYSTRAT_HTTP_KEEPALIVE_EXPIRY,
+MYSTRAT_HTTP_TIMEOUT.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from generate import AsyncOpenAIProvider, LLMProvider, OpenAIProvider
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry: float = 60.0
+    timeout: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.getenv("MYSTRAT_HTTP_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("MYSTRAT_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("MYSTRAT_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            timeout=float(os.getenv("MYSTRAT_HTTP_TIMEOUT", cls.timeout)),
+        )
+
+
+_LOCK = threading.RLock()
+_HTTP_CLIENTS: Dict[PoolSettings, Any] = {}
+_ASYNC_HTTP_CLIENTS: Dict[PoolSettings, Any] = {}
+_PROVIDERS: Dict[Tuple, LLMProvider] = {}
+_LIMITERS: Dict[Tuple, Any] = {}
+_CACHES: Dict[str, Any] = {}
+_WARMED: set = set()
+
+
+def _limits(pool: PoolSettings) -> Any:
+    import httpx  # type: ignore  # installed with the openai SDK
+
+    return httpx.Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+
+
+def http_client(pool: Optional[PoolSettings] = None) -> Any:
+    """The process-wide httpx client for `pool` settings (created on first use)."""
+    pool = pool or PoolSettings.from_env()
+    with _LOCK:
+        client = _HTTP_CLIENTS.get(pool)
+        if client is None:
+            import openai  # type: ignore
+
+            client = _HTTP_CLIENTS[pool] = openai.DefaultHttpxClient(limits=_limits(pool), timeout=pool.timeout)
+        return client
+
+
+def async_http_client(pool: Optional[PoolSettings] = None) -> Any:
+    """The process-wide httpx.AsyncClient for `pool` settings, for AsyncOpenAIProvider.
+    Its connections belong to the event loop that opened them: use it from one
+    long-lived loop (e.g. a batch run), not a fresh `asyncio.run()` per call."""
+    pool = pool or PoolSettings.from_env()
+    with _LOCK:
+        client = _ASYNC_HTTP_CLIENTS.get(pool)
+        if client is None:
+            import openai  # type: ignore
+
+            client = _ASYNC_HTTP_CLIENTS[pool] = openai.DefaultAsyncHttpxClient(limits=_limits(pool), timeout=pool.timeout)
+        return client
+
+
+def _key_id(api_key: Optional[str]) -> str:
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def get_provider(
+    model: str = "gpt-4o-mini",
+    *,
+    api_key: Optional[str] = None,
+    pool: Optional[PoolSettings] = None,
+    requests_per_min: Optional[float] = None,
+    tokens_per_min: Optional[float] = None,
+    cache_path: Optional[str] = "",
+    asynchronous: bool = False,
+) -> LLMProvider:
+    """Shared provider for these settings.
+
+    Rate limits default to MYSTRAT_RPM / MYSTRAT_TPM and apply per API key (all models
+    on a key share one limiter). `cache_path` "" uses the default LLM cache file,
+    None disables caching. `asynchronous` builds an AsyncOpenAIProvider whose
+    `acomplete` goes through the shared async pool.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    pool = pool or PoolSettings.from_env()
+    rpm = float(requests_per_min if requests_per_min is not None else os.getenv("MYSTRAT_RPM", "500"))
+    tpm = float(tokens_per_min if tokens_per_min is not None else os.getenv("MYSTRAT_TPM", "200000"))
+    key = (model, _key_id(api_key), pool, rpm, tpm, cache_path, asynchronous)
+    with _LOCK:
+        provider = _PROVIDERS.get(key)
+        if provider is not None:
+            return provider
+
+        from llm_cache import DEFAULT_CACHE_PATH, CachingProvider, LLMCache
+        from ratelimit import RateLimitedProvider, RateLimiter
+
+        if asynchronous:
+            provider = AsyncOpenAIProvider(
+                model=model, api_key=api_key, max_retries=0,
+                http_client=http_client(pool), async_http_client=async_http_client(pool),
+            )
+        else:
+            provider = OpenAIProvider(model=model, api_key=api_key, max_retries=0, http_client=http_client(pool))
+        limiter = _LIMITERS.get((_key_id(api_key), rpm, tpm))
+        if limiter is None:
+            limiter = _LIMITERS[(_key_id(api_key), rpm, tpm)] = RateLimiter(requests_per_min=rpm, tokens_per_min=tpm)
+        provider = RateLimitedProvider(provider, limiter)
+        if cache_path is not None:
+            path = cache_path or DEFAULT_CACHE_PATH
+            cache = _CACHES.get(path)
+            if cache is None:
+                cache = _CACHES[path] = LLMCache(path)
+            provider = CachingProvider(provider, cache)
+        _PROVIDERS[key] = provider
+        return provider
+
+
+def _base_client(provider: LLMProvider) -> Any:
+    p: Any = provider
+    while p is not None and not hasattr(p, "client"):
+        p = getattr(p, "inner", None)
+    return getattr(p, "client", None)
+
+
+def prewarm(provider: LLMProvider, *, connections: int = 2, block: bool = False) -> Optional[threading.Thread]:
+    """Open `connections` pooled connections to the API host in the background.
+    Uses the token-free models endpoint; errors are ignored. Each client is warmed once.
+    """
+    client = _base_client(provider)
+    if client is None:
+        return None
+    with _LOCK:
+        if id(client) in _WARMED:
+            return None
+        _WARMED.add(id(client))
+
+    def _ping() -> None:
+        try:
+            client.with_options(max_retries=0, timeout=10).models.list()
+        except Exception:
+            pass
+
+    def _run() -> None:
+        pings = [threading.Thread(target=_ping, daemon=True) for _ in range(max(1, connections))]
+        for t in pings:
+            t.start()
+        for t in pings:
+            t.join()
+
+    t = threading.Thread(target=_run, name="llm-prewarm", daemon=True)
+    t.start()
+    if block:
+        t.join()
+    return t
+
+
+_STARTED: set = set()
+
+
+def warm_start(model: str = "gpt-4o-mini", *, api_key: Optional[str] = None, connections: int = 2) -> bool:
+    """Build the shared provider and prewarm it on a background thread, once per
+    (model, key). The caller does not wait for the OpenAI SDK import or the
+    handshake. Returns False if this pair was already started.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _LOCK:
+        if (model, _key_id(api_key)) in _STARTED:
+            return False
+        _STARTED.add((model, _key_id(api_key)))
+
+    def _run() -> None:
+        try:
+            prewarm(get_provider(model, api_key=api_key), connections=connections, block=True)
+        except Exception:
+            pass
+
+    threading.Thread(target=_run, name="llm-warm-start", daemon=True).start()
+    return True
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """Configured pools and how many providers share them."""
+    with _LOCK:
+        return [
+            {**pool.__dict__, "providers": sum(1 for k in _PROVIDERS if k[2] == pool)}
+            for pool in _HTTP_CLIENTS
+        ]
+
+
+def close_all() -> None:
+    """Close pooled connections and forget cached providers (tests, batch shutdown)."""
+    with _LOCK:
+        for client in _HTTP_CLIENTS.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _HTTP_CLIENTS.clear()
+        _PROVIDERS.clear()
+        _LIMITERS.clear()
+        _CACHES.clear()
+        _WARMED.clear()
+        _STARTED.clear()
@@ -0,0 +1,343 @@
+"""
+Rate limiting, retry/backoff and adaptive concurrency for LLM providers.
+
+- `TokenBucket`: requests/min and tokens/min budgets (blocking and async acquire)
+- `RetryPolicy`: jittered exponential backoff, honours Retry-After when present
+- `AdaptiveConcurrency`: AIMD limit on in-flight calls (halves on 429, +1 per window of successes)
+- `RateLimiter` bundles the three plus counters; share one per process
+- `RateLimitedProvider` applies a RateLimiter to every complete/acomplete/stream call
+
+Usage:
+
+    from generate import OpenAIProvider, StrategyGenerator
+    from ratelimit import RateLimiter, RateLimitedProvider
+
+    limiter = RateLimiter(requests_per_min=500, tokens_per_min=200_000)
+    provider = RateLimitedProvider(OpenAIProvider(model="gpt-4o-mini", max_retries=0), limiter)
+    gen = StrategyGenerator(provider, max_workers=4)
+    limiter.stats()  # {"calls": .., "retries": .., "throttles": .., "concurrency_limit": .., ...}
+
+Wrap the cache outside the limiter (CachingProvider(RateLimitedProvider(...))) so
+cache hits do not spend rate budget.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import metrics
+from generate import LLMProvider, clear_last_usage, last_usage
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate_per_min`.
+    `capacity` (default: one minute of budget) bounds bursts. A request larger
+    than the capacity is let through once the bucket is full.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_min)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n: float) -> float:
+        """Take `n` tokens if available; else return seconds to wait before retrying."""
+        n = min(n, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate if self.rate > 0 else 1.0
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Block until `n` tokens are taken; return seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self._reserve(n)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def refund(self, n: float) -> None:
+        """Return `n` tokens taken by acquire() but not used (capped at capacity)."""
+        if n <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + n)
+
+    async def aacquire(self, n: float = 1.0) -> float:
+        waited = 0.0
+        while True:
+            wait = self._reserve(n)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on concurrent calls: the limit grows by one after a full window of
+    successes and is multiplied by `decrease` on every throttle.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, decrease: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def aacquire(self) -> None:
+        delay = 0.005
+        while not self._try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= int(self.limit):
+                self._successes = 0
+                self.limit = min(self.maximum, self.limit + 1)
+                self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self._successes = 0
+            self.limit = max(self.minimum, self.limit * self.decrease)
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff: sleep ~ U(0, min(max_delay, base * 2**attempt))."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _retry_after(exc: Optional[BaseException]) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc: BaseException) -> Tuple[bool, bool]:
+    """(retryable, throttled) for a provider exception.
+    429s are throttles; timeouts, connection errors, 408/409 and 5xx are retryable.
+    """
+    code = _status_code(exc)
+    if code == 429:
+        return True, True
+    if code is not None:
+        return code in (408, 409) or code >= 500, False
+    name = type(exc).__name__
+    if name in ("RateLimitError",):
+        return True, True
+    if isinstance(exc, (TimeoutError, ConnectionError)) or name in ("APITimeoutError", "APIConnectionError", "Timeout", "ConnectTimeout", "ReadTimeout"):
+        return True, False
+    return False, False
+
+
+class RateLimiter:
+    """Process-wide call governor: RPM/TPM buckets, AIMD concurrency, retries, counters."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_min: float = 500,
+        tokens_per_min: float = 200_000,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min)
+        self.concurrency = AdaptiveConcurrency(initial=initial_concurrency, maximum=max_concurrency)
+        self.retry = retry or RetryPolicy()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {
+            "calls": 0, "successes": 0, "failures": 0, "retries": 0, "throttles": 0, "wait_s": 0.0,
+        }
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        metrics.inc(_METRIC_NAMES.get(name, f"mystrat_ratelimit_{name}_total"), n)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.counters)
+        out["wait_s"] = round(out["wait_s"], 3)
+        out["concurrency_limit"] = int(self.concurrency.limit)
+        out["in_flight"] = self.concurrency.in_flight
+        return out
+
+
+# RateLimiter counters as exported by metrics.prometheus_text()
+_METRIC_NAMES = {
+    "calls": "mystrat_llm_calls_total",
+    "successes": "mystrat_llm_successes_total",
+    "failures": "mystrat_llm_failures_total",
+    "retries": "mystrat_llm_retries_total",
+    "throttles": "mystrat_llm_throttles_total",
+    "wait_s": "mystrat_ratelimit_wait_seconds_total",
+}
+
+
+def _estimate_tokens(system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+    # ~4 chars/token for the prompt, plus the completion allowance
+    return (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+
+
+def _settle(bucket: TokenBucket, cost: int) -> None:
+    # the call was charged `cost` up front; give back what its reported usage did not
+    # spend. Calls without a usage record in this context (e.g. run on another thread)
+    # keep the full charge.
+    used = last_usage()
+    if used is not None:
+        bucket.refund(min(cost, bucket.capacity) - used["prompt_tokens"] - used["completion_tokens"])
+
+
+class RateLimitedProvider(LLMProvider):
+    """Applies a `RateLimiter` (buckets, concurrency slot, retries) around every call."""
+
+    def __init__(self, inner: LLMProvider, limiter: Optional[RateLimiter] = None):
+        self.inner = inner
+        self.limiter = limiter or RateLimiter()
+        self.model = getattr(inner, "model", type(inner).__name__)
+
+    def _should_retry(self, exc: BaseException, attempt: int) -> bool:
+        retryable, throttled = classify(exc)
+        if throttled:
+            self.limiter.count("throttles")
+            self.limiter.concurrency.on_throttle()
+        if retryable and attempt < self.limiter.retry.max_retries:
+            self.limiter.count("retries")
+            return True
+        self.limiter.count("failures")
+        return False
+
+    def complete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        lim = self.limiter
+        cost = _estimate_tokens(system_prompt, user_prompt, max_tokens)
+        for attempt in range(lim.retry.max_retries + 1):
+            lim.count("wait_s", lim.requests.acquire() + lim.tokens.acquire(cost))
+            lim.concurrency.acquire()
+            lim.count("calls")
+            clear_last_usage()
+            try:
+                text = self.inner.complete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                delay = lim.retry.delay(attempt, e)
+            else:
+                _settle(lim.tokens, cost)
+                lim.concurrency.on_success()
+                lim.count("successes")
+                return text
+            finally:
+                lim.concurrency.release()
+            time.sleep(delay)
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> str:
+        lim = self.limiter
+        cost = _estimate_tokens(system_prompt, user_prompt, max_tokens)
+        for attempt in range(lim.retry.max_retries + 1):
+            lim.count("wait_s", await lim.requests.aacquire() + await lim.tokens.aacquire(cost))
+            await lim.concurrency.aacquire()
+            lim.count("calls")
+            clear_last_usage()
+            try:
+                text = await self.inner.acomplete(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                delay = lim.retry.delay(attempt, e)
+            else:
+                _settle(lim.tokens, cost)
+                lim.concurrency.on_success()
+                lim.count("successes")
+                return text
+            finally:
+                lim.concurrency.release()
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def stream(self, system_prompt: str, user_prompt: str, *, temperature: float = 0.2, max_tokens: int = 1200) -> Iterator[str]:
+        # Retries only before the first chunk; a stream that breaks mid-way is not replayed.
+        lim = self.limiter
+        cost = _estimate_tokens(system_prompt, user_prompt, max_tokens)
+        for attempt in range(lim.retry.max_retries + 1):
+            lim.count("wait_s", lim.requests.acquire() + lim.tokens.acquire(cost))
+            lim.concurrency.acquire()
+            lim.count("calls")
+            started = False
+            clear_last_usage()
+            try:
+                for chunk in self.inner.stream(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    lim.count("failures")
+                    raise
+                if not self._should_retry(e, attempt):
+                    raise
+                delay = lim.retry.delay(attempt, e)
+            else:
+                _settle(lim.tokens, cost)
+                lim.concurrency.on_success()
+                lim.count("successes")
+                return
+            finally:
+                lim.concurrency.release()
+            time.sleep(delay)